@@ -0,0 +1,162 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.14"
+# dependencies = []
+# ///
+"""Aggregation micro-benchmark for apfs_usage_audit: time and peak memory per file.
+
+Usage: uv run python scripts/bench_aggregation.py [--files 1000000] [--clone-ratio 0.3] [--group-size 3]
+
+Feeds the same synthetic probe records through the original per-file path (a
+resolved `Path`, a `FileMetrics` dataclass, and two clone dicts) and the current
+streaming one (value tuples into a `CloneGroupTable`), checks both summaries
+match, and reports wall time and tracemalloc peak for each. No filesystem
+access, so the numbers isolate aggregation from probing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import struct
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+
+MODULE_PATH = Path(__file__).resolve().with_name("apfs_usage_audit.py")
+SPEC = importlib.util.spec_from_file_location("apfs_usage_audit", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+audit = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = audit
+SPEC.loader.exec_module(audit)
+
+
+@dataclass
+class LegacyFileMetrics:
+    path: str
+    kind: str
+    file_id: int
+    logical_bytes: int
+    allocated_bytes: int
+    reclaimable_bytes: int
+    clone_id: int
+    clone_refcnt: int
+    ext_flags: int
+    may_share_blocks: bool
+    shares_all_blocks: bool
+
+
+@dataclass
+class LegacyAggregateStats:
+    """The pre-packing accumulator, kept verbatim as the baseline."""
+
+    file_count: int = 0
+    dir_count: int = 0
+    skipped_paths: int = 0
+    logical_bytes: int = 0
+    allocated_bytes: int = 0
+    reclaimable_bytes: int = 0
+    may_share_blocks_files: int = 0
+    shares_all_blocks_files: int = 0
+    clone_members_by_id: dict[int, int] = field(default_factory=dict)
+    clone_refcnt_by_id: dict[int, int] = field(default_factory=dict)
+
+    def add_file(self, metrics: LegacyFileMetrics) -> None:
+        self.file_count += 1
+        self.logical_bytes += metrics.logical_bytes
+        self.allocated_bytes += metrics.allocated_bytes
+        self.reclaimable_bytes += metrics.reclaimable_bytes
+        if metrics.may_share_blocks:
+            self.may_share_blocks_files += 1
+        if metrics.shares_all_blocks:
+            self.shares_all_blocks_files += 1
+        if metrics.clone_refcnt > 1:
+            self.clone_members_by_id[metrics.clone_id] = self.clone_members_by_id.get(metrics.clone_id, 0) + 1
+            self.clone_refcnt_by_id[metrics.clone_id] = max(
+                metrics.clone_refcnt,
+                self.clone_refcnt_by_id.get(metrics.clone_id, 0),
+            )
+
+
+RECORD = struct.Struct("=QQQQQQQ??")
+
+
+def synthetic_stream(files: int, clone_ratio: float, group_size: int, seed: int) -> bytes:
+    """Packed probe records; cloned files share an id with `group_size - 1` siblings.
+
+    Records are unpacked per file during the run, so every value is a fresh int,
+    as it is when a probe decodes a getattrlist or stat result.
+    """
+    rng = random.Random(seed)
+    stream = bytearray()
+    for index in range(files):
+        logical = rng.randrange(1, 1 << 20)
+        allocated = (logical + 4095) // 4096 * 4096
+        if rng.random() < clone_ratio:
+            clone_id = (1 << 40) + index // group_size
+            values = (index, logical, allocated, 0, clone_id, group_size + rng.randrange(2), 1, True, True)
+        else:
+            values = (index, logical, allocated, allocated, 0, 1, 0, False, False)
+        stream += RECORD.pack(*values)
+    return bytes(stream)
+
+
+def legacy_run(stream: bytes) -> Any:
+    stats = LegacyAggregateStats()
+    for values in RECORD.iter_unpack(stream):
+        # The old walk resolved a Path and kept one FileMetrics per probed file.
+        path = str(Path(f"/Volumes/Data/Users/demo/Library/Caches/app/{values[0]}.bin"))
+        stats.add_file(LegacyFileMetrics(path, "file", *values))
+    return stats
+
+
+def streaming_run(stream: bytes) -> Any:
+    stats = audit.AggregateStats()
+    for values in RECORD.iter_unpack(stream):
+        stats.add_probe(values)
+    return stats
+
+
+def measure(label: str, run: Callable[[bytes], Any], stream: bytes) -> tuple[Any, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    stats = run(stream)
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # A second untraced pass for wall time; tracemalloc inflates allocation-heavy code.
+    start = time.perf_counter()
+    run(stream)
+    untraced = time.perf_counter() - start
+    print(f"{label:<10} {untraced:8.2f}s  (traced {elapsed:6.2f}s)  peak {peak / (1 << 20):9.1f} MiB")
+    return stats, untraced, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AggregateStats time and memory per file")
+    parser.add_argument("--files", type=int, default=1_000_000, help="Synthetic files (default: 1000000)")
+    parser.add_argument("--clone-ratio", type=float, default=0.3, help="Fraction of cloned files (default: 0.3)")
+    parser.add_argument("--group-size", type=int, default=3, help="Files per clone group (default: 3)")
+    parser.add_argument("--seed", type=int, default=7, help="RNG seed (default: 7)")
+    args = parser.parse_args()
+
+    stream = synthetic_stream(args.files, args.clone_ratio, args.group_size, args.seed)
+    legacy, legacy_time, legacy_peak = measure("legacy", legacy_run, stream)
+    current, current_time, current_peak = measure("streaming", streaming_run, stream)
+
+    root = Path("/bench")
+    expected = audit.finalize_summary(root, "directory", audit.AggregateStats(
+        **{name: getattr(legacy, name) for name in audit.AggregateStats.SCALAR_FIELDS},
+        clone_members_by_id=legacy.clone_members_by_id,
+        clone_refcnt_by_id=legacy.clone_refcnt_by_id,
+    ))
+    assert audit.finalize_summary(root, "directory", current) == expected, "summary mismatch"
+    print(
+        f"{args.files} files, {len(current.clone_groups)} clone groups: "
+        f"time x{legacy_time / current_time:.2f}, peak memory x{legacy_peak / max(current_peak, 1):.1f} lower"
+    )
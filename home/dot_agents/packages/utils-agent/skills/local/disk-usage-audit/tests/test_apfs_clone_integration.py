@@ -16,6 +16,7 @@ sys.modules[SPEC.name] = MODULE
 SPEC.loader.exec_module(MODULE)
 
 
+@unittest.skipUnless(sys.platform == "darwin", "requires APFS clones (cp -c)")
 class ApfsCloneIntegrationTests(unittest.TestCase):
     def test_probe_file_reports_clone_metadata_for_full_clone(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -11,6 +11,7 @@ from pathlib import Path
 SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "apfs_usage_audit.py"
 
 
+@unittest.skipUnless(sys.platform == "darwin", "requires APFS clones (cp -c)")
 class ApfsUsageCliTests(unittest.TestCase):
     def test_validate_top_distinguishes_unique_and_shared_candidates(self) -> None:
         with tempfile.TemporaryDirectory() as root_tmpdir, tempfile.TemporaryDirectory() as external_tmpdir:
@@ -63,7 +64,7 @@ class ApfsUsageCliTests(unittest.TestCase):
             self.assertGreater(summaries[str(unique_dir)]["reclaimable_bytes"], 0)
             self.assertEqual(summaries[str(shared_dir)]["reclaimable_bytes"], 0)
             self.assertGreater(summaries[str(shared_dir)]["external_clone_groups"], 0)
-            self.assertIn(payload["discovery"]["tool"], {"du", "gdu"})
+            self.assertEqual(payload["discovery"]["tool"], "native")
             logical = {entry["path"]: entry for entry in payload["logical_candidates"]}
             self.assertEqual(
                 merged[str(unique_dir)]["du_candidate_bytes"],
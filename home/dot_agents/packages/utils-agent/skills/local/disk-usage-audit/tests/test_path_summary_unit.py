@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import importlib.util
+import os
 import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
 MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "apfs_usage_audit.py"
@@ -74,6 +77,132 @@ class PathSummaryUnitTests(unittest.TestCase):
             ["/tmp/root/a", "/tmp/root/b"],
         )
 
+    def test_stat_backend_groups_hard_links_as_a_clone_group(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "private.bin").write_bytes(b"x" * 65536)
+            (root / "linked.bin").write_bytes(b"y" * 65536)
+            os.link(root / "linked.bin", root / "linked-again.bin")
+            MODULE.set_probe_backend("stat")
+            try:
+                private = MODULE.probe_file(root / "private.bin")
+                summary = MODULE.summarize_target(root, workers=2)
+            finally:
+                MODULE.set_probe_backend(None)
+
+        self.assertEqual(private.reclaimable_bytes, private.allocated_bytes)
+        self.assertEqual(private.clone_refcnt, 1)
+        self.assertEqual(summary["file_count"], 3)
+        self.assertEqual(summary["reclaimable_bytes"], private.allocated_bytes)
+        self.assertEqual(summary["fully_contained_clone_groups"], 1)
+        self.assertEqual(summary["external_clone_groups"], 0)
+
+    def test_native_discovery_matches_per_candidate_walks(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir).resolve()
+            for name, size in (("big", 6), ("small", 2), ("big/nested", 3)):
+                (root / name).mkdir(parents=True, exist_ok=True)
+                (root / name / "data.bin").write_bytes(os.urandom(size * 4096))
+
+            payload = MODULE.validate_top(root, depth=2, top=3, workers=2)
+            expected = {
+                candidate["path"]: MODULE.walk_directory(candidate["path"]).allocated_bytes
+                for candidate in payload["logical_candidates"]
+            }
+
+        self.assertEqual(payload["discovery"]["tool"], "native")
+        self.assertEqual(
+            [candidate["path"] for candidate in payload["logical_candidates"]],
+            [str(root / "big"), str(root / "small")],
+        )
+        for summary in payload["validated_candidates"]:
+            self.assertEqual(summary["allocated_bytes"], expected[summary["path"]])
+            self.assertEqual(summary["du_candidate_bytes"], summary["allocated_bytes"])
+
+    def test_every_walk_stays_on_the_root_filesystem(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir).resolve() / "tree"
+            (root / "mounted").mkdir(parents=True)
+            (root / "top.bin").write_bytes(os.urandom(4096))
+            (root / "mounted" / "data.bin").write_bytes(os.urandom(8192))
+            store = MODULE.SnapshotStore(Path(tmpdir) / "snapshots.sqlite3")
+            # Pretend the root sits on another device, so "mounted" looks like a mount point below it.
+            foreign = os.stat(root).st_dev + 1
+            try:
+                with mock.patch.object(MODULE, "_root_device", return_value=foreign):
+                    walks = {
+                        "walk_directory": MODULE.walk_directory(root, 2),
+                        "walk_directory_levels": MODULE.walk_directory_levels(root, 1, 2)[str(root)],
+                        "walk_directory_incremental": MODULE.walk_directory_incremental(root, store, 2)[0],
+                    }
+                    summaries = {
+                        "summarize_targets": MODULE.summarize_targets([root], 2)[0],
+                        "summarize_targets(snapshot)": MODULE.summarize_targets([root], 2, snapshot_store=store)[0],
+                    }
+            finally:
+                store.close()
+
+        for name, stats in walks.items():
+            with self.subTest(name):
+                self.assertEqual((stats.file_count, stats.dir_count, stats.skipped_paths), (1, 0, 1))
+        for name, summary in summaries.items():
+            with self.subTest(name):
+                self.assertEqual((summary["file_count"], summary["dir_count"]), (1, 0))
+
+    def test_snapshot_reuses_unchanged_directories_and_reports_growth(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir).resolve() / "tree"
+            for name in ("a", "b", "b/deep"):
+                (root / name).mkdir(parents=True)
+                (root / name / "data.bin").write_bytes(os.urandom(8192))
+            for directory in (root, root / "a", root / "b", root / "b" / "deep"):
+                os.utime(directory, ns=(1_600_000_000_000_000_000, 1_600_000_000_000_000_000))
+            store = MODULE.SnapshotStore(Path(tmpdir) / "snapshots.sqlite3")
+            try:
+                first = MODULE.summarize_targets([root], 2, snapshot_store=store)[0]
+                (root / "b" / "deep" / "new.bin").write_bytes(os.urandom(65536))
+                os.utime(root / "b" / "deep", ns=(1_600_000_100_000_000_000, 1_600_000_100_000_000_000))
+                second = MODULE.summarize_targets([root], 2, snapshot_store=store)[0]
+                expected = MODULE.walk_directory(root)
+            finally:
+                store.close()
+
+        self.assertIsNone(first["snapshot"]["delta"])
+        self.assertEqual(first["snapshot"]["reused_directories"], 0)
+        self.assertEqual(second["snapshot"]["reused_directories"], 3)
+        self.assertEqual(second["snapshot"]["scanned_directories"], 1)
+        self.assertEqual(second["file_count"], expected.file_count)
+        self.assertEqual(second["allocated_bytes"], expected.allocated_bytes)
+        self.assertEqual(second["snapshot"]["delta"]["file_count"], 1)
+        self.assertEqual(
+            [entry["path"] for entry in second["snapshot"]["top_growth"]],
+            [str(root / "b" / "deep")],
+        )
+
+    def test_clone_group_table_merges_members_and_keeps_max_refcnt(self) -> None:
+        left = MODULE.AggregateStats()
+        right = MODULE.AggregateStats(clone_members_by_id={7: 2, 9: 1}, clone_refcnt_by_id={7: 5, 9: 2})
+        for clone_id in range(1, 5000):
+            left.add(10, 4096, 0, clone_id * 4096, 3, True, True)
+        left.add(10, 4096, 0, 7, 2, True, True)
+        left.add(10, 4096, 4096, 11, 1, False, False)
+
+        left.merge(right)
+
+        self.assertEqual(len(left.clone_groups), 5001)
+        self.assertEqual(left.clone_members_by_id[7], 3)
+        self.assertEqual(left.clone_refcnt_by_id[7], 5)
+        self.assertEqual(left.clone_members_by_id[9], 1)
+        self.assertNotIn(11, left.clone_members_by_id)
+        self.assertEqual(MODULE.AggregateStats.from_dict(left.to_dict()), left)
+
+    def test_default_probe_backend_matches_platform(self) -> None:
+        expected = {"darwin": "getattrlist", "linux": "fiemap"}.get(sys.platform, "stat")
+        self.assertEqual(MODULE.default_probe_backend_name(), expected)
+        metrics = MODULE.probe_file(MODULE_PATH)
+        self.assertEqual(metrics.logical_bytes, MODULE_PATH.stat().st_size)
+        self.assertEqual(metrics.file_id, MODULE_PATH.stat().st_ino)
+
 
 if __name__ == "__main__":
     unittest.main()
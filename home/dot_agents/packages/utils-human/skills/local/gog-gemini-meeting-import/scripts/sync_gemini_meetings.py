@@ -7,6 +7,7 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
 import re
@@ -14,6 +15,8 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -33,6 +36,7 @@ CALENDAR_FIELDS = (
     "attachments(fileUrl,title),"
     "conferenceData(entryPoints(uri,entryPointType)),"
     "hangoutLink,"
+    "updated,"
     "start,"
     "end,"
     "attendees(email,self,responseStatus),"
@@ -41,6 +45,13 @@ CALENDAR_FIELDS = (
     "nextPageToken"
 )
 
+# Incremental discovery re-reads this much before the recorded high-water mark:
+# Gemini attaches notes to the event (and finishes the doc) after the meeting.
+DISCOVERY_OVERLAP = timedelta(days=1)
+# Incremental Drive discovery stops paging early, which is only safe while a
+# full-window sweep still runs regularly.
+FULL_DISCOVERY_INTERVAL = timedelta(days=1)
+
 
 @dataclass
 class Candidate:
@@ -168,7 +179,14 @@ def discover_drive_candidates(
     max_pages: int,
     per_page: int,
     run_dir: Path,
-) -> dict[str, Candidate]:
+    stop_at_stale_page: bool = False,
+) -> tuple[dict[str, Candidate], datetime | None]:
+    """Page through Drive search results.
+
+    Returns the candidates and the newest `modifiedTime` among them. With
+    `stop_at_stale_page`, paging stops at the first page with nothing modified
+    since `since`.
+    """
     candidates: dict[str, Candidate] = {}
     page_token = ""
     page = 0
@@ -187,12 +205,15 @@ def discover_drive_candidates(
                 candidates[doc_id].merge_from(cand)
             else:
                 candidates[doc_id] = cand
+        if stop_at_stale_page and not page_candidates:
+            break
 
         page_token = payload.get("nextPageToken") if isinstance(payload, dict) else ""
         if not isinstance(page_token, str) or not page_token:
             break
         page += 1
-    return candidates
+    modified_times = [cand.modified_time for cand in candidates.values() if cand.modified_time]
+    return candidates, max(modified_times, default=None)
 
 
 def _candidates_from_calendar_payload(payload: Any) -> dict[str, Candidate]:
@@ -237,8 +258,10 @@ def discover_calendar_candidates(
     max_pages: int,
     per_page: int,
     run_dir: Path,
-) -> dict[str, Candidate]:
+) -> tuple[dict[str, Candidate], datetime | None]:
+    """Page through calendar events; returns candidates and the newest event `updated`."""
     candidates: dict[str, Candidate] = {}
+    latest_update: datetime | None = None
     page_token = ""
     page = 0
     while page < max_pages:
@@ -264,12 +287,83 @@ def discover_calendar_candidates(
                 candidates[doc_id].merge_from(cand)
             else:
                 candidates[doc_id] = cand
+        page_update = _latest_calendar_update(payload)
+        if page_update and (latest_update is None or page_update > latest_update):
+            latest_update = page_update
 
         page_token = payload.get("nextPageToken") if isinstance(payload, dict) else ""
         if not isinstance(page_token, str) or not page_token:
             break
         page += 1
-    return candidates
+    return candidates, latest_update
+
+
+def _latest_calendar_update(payload: Any) -> datetime | None:
+    if not isinstance(payload, dict) or not isinstance(payload.get("events"), list):
+        return None
+    updates = [
+        updated
+        for event in payload["events"]
+        if isinstance(event, dict) and (updated := _parse_rfc3339(event.get("updated")))
+    ]
+    return max(updates, default=None)
+
+
+def load_discovery_state(state_path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def save_discovery_state(state_path: Path, state: dict[str, Any]) -> None:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    partial = state_path.with_name(f".{state_path.name}.partial")
+    partial.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    partial.replace(state_path)
+
+
+def pending_retries(state: dict[str, Any]) -> dict[str, datetime | None]:
+    """Docs an earlier run discovered but did not finish, with their modifiedTime."""
+    pending = state.get("pending")
+    if not isinstance(pending, dict):
+        return {}
+    return {doc_id: _parse_rfc3339(modified) for doc_id, modified in pending.items() if isinstance(doc_id, str)}
+
+
+def processed_digest(docids: set[str]) -> str:
+    """Fingerprint of the processed doc IDs, to notice lines removed by hand."""
+    return hashlib.sha256("\n".join(sorted(docids)).encode("utf-8")).hexdigest()
+
+
+def incremental_cutoff(entry: Any, *, now: datetime) -> datetime | None:
+    """Where an incremental discovery can start, or None when a full sweep is due."""
+    if not isinstance(entry, dict):
+        return None
+    high_water = _parse_rfc3339(entry.get("high_water"))
+    full_sweep_at = _parse_rfc3339(entry.get("full_sweep_at"))
+    if high_water is None or full_sweep_at is None or now - full_sweep_at > FULL_DISCOVERY_INTERVAL:
+        return None
+    return high_water - DISCOVERY_OVERLAP
+
+
+def advance_discovery_state(
+    state: dict[str, Any],
+    source: str,
+    *,
+    high_water: datetime | None,
+    full_sweep: bool,
+    now: datetime,
+) -> None:
+    entry = state.get(source)
+    entry = dict(entry) if isinstance(entry, dict) else {}
+    previous = _parse_rfc3339(entry.get("high_water"))
+    if high_water and (previous is None or high_water > previous):
+        entry["high_water"] = high_water.astimezone(timezone.utc).isoformat()
+    if full_sweep:
+        entry["full_sweep_at"] = now.astimezone(timezone.utc).isoformat()
+    state[source] = entry
 
 
 def load_processed_docids(state_file: Path) -> set[str]:
@@ -309,7 +403,9 @@ def ensure_state_dir(state_dir: Path) -> None:
         readme.write_text(
             "# Gemini meeting sync state\n\n"
             "This folder intentionally contains only:\n\n"
-            "- `processed-docids.txt`: one Google Doc ID per line\n\n"
+            "- `processed-docids.txt`: one Google Doc ID per line\n"
+            "- `discovery-state.json`: Drive/Calendar high-water marks for incremental discovery,\n"
+            "  plus docs to retry\n\n"
             "To reprocess a doc, delete its line from `processed-docids.txt` or run the sync script with `--force <docId>`.\n",
             encoding="utf-8",
         )
@@ -391,20 +487,12 @@ def run_importer(
     return payload
 
 
-def generate_notes_with_codex(
-    *,
-    transcript_path: Path,
-    notes_path: Path,
-    meeting_notes_prompt_path: Path,
-    run_dir: Path,
-    doc_id: str,
-) -> None:
-    transcript = transcript_path.read_text(encoding="utf-8", errors="replace")
-    meeting_prompt = meeting_notes_prompt_path.read_text(encoding="utf-8", errors="replace")
-
+def ensure_notes_schema(run_dir: Path) -> Path:
     schema_path = run_dir / "meeting-notes.schema.json"
     if not schema_path.exists():
-        schema_path.write_text(
+        # Written via rename so a concurrent codex exec never reads a partial schema.
+        partial = run_dir / f".meeting-notes.schema.json.{threading.get_ident()}"
+        partial.write_text(
             json.dumps(
                 {
                     "type": "object",
@@ -417,7 +505,22 @@ def generate_notes_with_codex(
             + "\n",
             encoding="utf-8",
         )
+        partial.replace(schema_path)
+    return schema_path
 
+
+def generate_notes_with_codex(
+    *,
+    transcript_path: Path,
+    notes_path: Path,
+    meeting_notes_prompt_path: Path,
+    run_dir: Path,
+    doc_id: str,
+) -> None:
+    transcript = transcript_path.read_text(encoding="utf-8", errors="replace")
+    meeting_prompt = meeting_notes_prompt_path.read_text(encoding="utf-8", errors="replace")
+
+    schema_path = ensure_notes_schema(run_dir)
     output_path = run_dir / f"codex-notes-{_short_doc_id(doc_id)}.json"
 
     prompt = (
@@ -466,6 +569,128 @@ def generate_notes_with_codex(
     notes_path.write_text(notes.rstrip() + "\n", encoding="utf-8")
 
 
+@dataclass
+class DocOutcome:
+    doc_id: str
+    message: str | None = None
+    error: str | None = None
+
+
+def run_pipeline(
+    work: list[Candidate],
+    *,
+    processed: set[str],
+    forced: set[str],
+    importer_path: Path,
+    meeting_prompt_path: Path,
+    out_dir: Path,
+    run_dir: Path,
+    state_file: Path,
+    import_workers: int,
+    notes_workers: int,
+    fail_fast: bool,
+) -> tuple[int, list[str]]:
+    """Import docs and generate their notes in two bounded stages.
+
+    gog exports run in one pool and `codex exec` in a separate, smaller one,
+    so a doc's notes start as soon as its own import finishes. Completions are
+    handled on the calling thread only: it appends to `processed-docids.txt`
+    and prints `[OK]`/`[ERROR]` lines in `work` order as soon as every earlier
+    doc has been reported.
+
+    Returns the number of newly processed docs and the errors in `work` order.
+    """
+    ensure_notes_schema(run_dir)
+    outcomes: list[DocOutcome | None] = [None] * len(work)
+    imported: dict[int, tuple[Path, Path]] = {}
+    stages: dict[Future[Any], tuple[int, str]] = {}
+    processed_this_run = 0
+    reported = 0
+    stopping = False
+
+    def report_ready() -> None:
+        nonlocal reported
+        while reported < len(outcomes) and outcomes[reported] is not None:
+            outcome = outcomes[reported]
+            if outcome.error is not None:
+                print(f"[ERROR] {outcome.error}", file=sys.stderr)
+            elif outcome.message is not None:
+                print(outcome.message)
+            reported += 1
+
+    with (
+        ThreadPoolExecutor(max_workers=max(import_workers, 1), thread_name_prefix="gog-import") as import_pool,
+        ThreadPoolExecutor(max_workers=max(notes_workers, 1), thread_name_prefix="codex-notes") as notes_pool,
+    ):
+        for index, cand in enumerate(work):
+            future = import_pool.submit(
+                run_importer,
+                importer_path=importer_path,
+                doc_id=cand.doc_id,
+                out_dir=out_dir,
+                run_dir=run_dir,
+                overwrite=(cand.doc_id in forced),
+            )
+            stages[future] = (index, "import")
+
+        while stages:
+            done, _ = wait(stages, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, stage = stages.pop(future)
+                doc_id = work[index].doc_id
+                if future.cancelled():
+                    # Skipped by --fail-fast; reported as neither success nor error.
+                    outcomes[index] = DocOutcome(doc_id)
+                    continue
+                try:
+                    if stage == "import":
+                        payload = future.result()
+                        transcript_path = Path(payload["transcript_path"])
+                        notes_path = Path(payload["notes_path"])
+                        if not transcript_path.exists():
+                            raise RuntimeError(f"Transcript missing after import: {transcript_path}")
+                        imported[index] = (transcript_path, notes_path)
+                        if not notes_path.exists():
+                            if stopping:
+                                outcomes[index] = DocOutcome(doc_id)
+                                continue
+                            notes_future = notes_pool.submit(
+                                generate_notes_with_codex,
+                                transcript_path=transcript_path,
+                                notes_path=notes_path,
+                                meeting_notes_prompt_path=meeting_prompt_path,
+                                run_dir=run_dir,
+                                doc_id=doc_id,
+                            )
+                            stages[notes_future] = (index, "notes")
+                            continue
+                    else:
+                        future.result()
+
+                    transcript_path, notes_path = imported[index]
+                    if notes_path.exists() and doc_id not in processed:
+                        append_processed_docid(state_file, doc_id)
+                        processed.add(doc_id)
+                        processed_this_run += 1
+                    outcomes[index] = DocOutcome(
+                        doc_id,
+                        message=(
+                            f"[OK] {doc_id} -> "
+                            f"{transcript_path.name} | {notes_path.name}{' (forced)' if doc_id in forced else ''}"
+                        ),
+                    )
+                except Exception as e:  # noqa: BLE001 - tool script, keep going unless fail-fast
+                    outcomes[index] = DocOutcome(doc_id, error=f"{doc_id}: {e}")
+                    if fail_fast and not stopping:
+                        stopping = True
+                        for pending in stages:
+                            pending.cancel()
+            report_ready()
+
+    errors = [outcome.error for outcome in outcomes if outcome is not None and outcome.error is not None]
+    return processed_this_run, errors
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Discover and import Gemini meeting Google Docs (transcripts + notes) into a local folder.",
@@ -514,6 +739,14 @@ def main() -> int:
         default=200,
         help="Max results per API page where supported (default: 200).",
     )
+    parser.add_argument(
+        "--full-discovery",
+        action="store_true",
+        help=(
+            "Ignore the saved discovery high-water marks and page through the whole --days window "
+            "(otherwise done automatically at most once a day)."
+        ),
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -545,7 +778,19 @@ def main() -> int:
     parser.add_argument(
         "--fail-fast",
         action="store_true",
-        help="Stop at the first error instead of continuing.",
+        help="Stop starting new docs at the first error; docs already running still finish.",
+    )
+    parser.add_argument(
+        "--import-workers",
+        type=int,
+        default=4,
+        help="Docs to export with gog concurrently (default: 4).",
+    )
+    parser.add_argument(
+        "--notes-workers",
+        type=int,
+        default=2,
+        help="codex exec note generations to run concurrently (default: 2).",
     )
     args = parser.parse_args()
 
@@ -590,33 +835,68 @@ def main() -> int:
     )
 
     account = args.account.strip() or None
-    candidates: dict[str, Candidate] = {}
+    discovery_state_path = state_dir / "discovery-state.json"
+    discovery_state = load_discovery_state(discovery_state_path)
+    # Incremental discovery only finds docs newer than the marks, so reprocessing
+    # older ones (--force, --force-missing-notes, or a line deleted from
+    # processed-docids.txt) needs the full window.
+    full_discovery = (
+        args.full_discovery
+        or bool(forced)
+        or args.force_missing_notes
+        or discovery_state.get("processed_digest") != processed_digest(processed)
+    )
+    drive_cutoff = None if full_discovery else incremental_cutoff(discovery_state.get("drive"), now=now)
+    calendar_cutoff = None if full_discovery else incremental_cutoff(discovery_state.get("calendar"), now=now)
+    discovery = {
+        "drive": "disabled" if args.no_drive else ("incremental" if drive_cutoff else "full"),
+        "calendar": "disabled" if args.no_calendar else ("incremental" if calendar_cutoff else "full"),
+    }
 
-    if not args.no_drive:
-        drive_candidates = discover_drive_candidates(
-            query="Notes by Gemini",
-            account=account,
-            since=since_utc,
-            max_pages=args.drive_max_pages,
-            per_page=args.per_page,
-            run_dir=run_dir,
-        )
-        candidates.update(drive_candidates)
+    # Both sources are independent gog paging loops, so run them side by side.
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="discovery") as pool:
+        drive_future = None
+        calendar_future = None
+        if not args.no_drive:
+            drive_future = pool.submit(
+                discover_drive_candidates,
+                query="Notes by Gemini",
+                account=account,
+                since=max(since_utc, drive_cutoff) if drive_cutoff else since_utc,
+                max_pages=args.drive_max_pages,
+                per_page=args.per_page,
+                run_dir=run_dir,
+                stop_at_stale_page=drive_cutoff is not None,
+            )
+        if not args.no_calendar:
+            calendar_future = pool.submit(
+                discover_calendar_candidates,
+                account=account,
+                date_from=(
+                    max(date_from, calendar_cutoff.astimezone().date().isoformat()) if calendar_cutoff else date_from
+                ),
+                date_to=date_to,
+                max_pages=args.calendar_max_pages,
+                per_page=args.per_page,
+                run_dir=run_dir,
+            )
+        drive_candidates, drive_high_water = drive_future.result() if drive_future else ({}, None)
+        cal_candidates, calendar_high_water = calendar_future.result() if calendar_future else ({}, None)
 
-    if not args.no_calendar:
-        cal_candidates = discover_calendar_candidates(
-            account=account,
-            date_from=date_from,
-            date_to=date_to,
-            max_pages=args.calendar_max_pages,
-            per_page=args.per_page,
-            run_dir=run_dir,
-        )
-        for doc_id, cand in cal_candidates.items():
-            if doc_id in candidates:
-                candidates[doc_id].merge_from(cand)
-            else:
-                candidates[doc_id] = cand
+    candidates: dict[str, Candidate] = dict(drive_candidates)
+    for doc_id, cand in cal_candidates.items():
+        if doc_id in candidates:
+            candidates[doc_id].merge_from(cand)
+        else:
+            candidates[doc_id] = cand
+    # Unfinished docs from earlier runs may sit behind the marks by now, so
+    # incremental discovery would not find them again.
+    retried = 0
+    for doc_id, modified_time in pending_retries(discovery_state).items():
+        if doc_id in candidates or (modified_time is not None and modified_time < since_utc):
+            continue
+        candidates[doc_id] = Candidate(doc_id=doc_id, sources={"retry"}, modified_time=modified_time)
+        retried += 1
 
     ordered = sorted(
         candidates.values(),
@@ -632,6 +912,8 @@ def main() -> int:
         "dry_run": args.dry_run,
         "run_dir": str(run_dir),
         "errors": 0,
+        "discovery": discovery,
+        "retried": retried,
     }
 
     def is_processed(doc_id: str) -> bool:
@@ -667,6 +949,7 @@ def main() -> int:
         f"Discovered: {summary['discovered_unique_doc_ids']} docs | "
         f"Processed: {summary['already_processed']} | "
         f"To process: {summary['to_process']} | "
+        f"Discovery: drive={discovery['drive']}, calendar={discovery['calendar']} | "
         f"Dry-run: {args.dry_run}"
     )
 
@@ -677,72 +960,62 @@ def main() -> int:
     importer_path = Path(__file__).resolve().parent / "import_gemini_meeting.py"
     meeting_prompt_path = Path(__file__).resolve().parents[1] / "references" / "meeting-notes.md"
 
-    processed_this_run = 0
-    errors: list[str] = []
     remaining = ordered
     if args.max_docs and args.max_docs > 0:
         remaining = ordered[: args.max_docs]
+    work = [
+        cand
+        for cand in remaining
+        if cand.doc_id not in processed or cand.doc_id in forced or args.force_missing_notes
+    ]
 
-    for cand in remaining:
-        doc_id = cand.doc_id
-        already_done = doc_id in processed
-        if already_done and doc_id not in forced and not args.force_missing_notes:
-            continue
-
-        try:
-            payload = run_importer(
-                importer_path=importer_path,
-                doc_id=doc_id,
-                out_dir=out_dir,
-                run_dir=run_dir,
-                overwrite=(doc_id in forced),
-            )
-            transcript_path = Path(payload["transcript_path"])
-            notes_path = Path(payload["notes_path"])
-            if not transcript_path.exists():
-                raise RuntimeError(f"Transcript missing after import: {transcript_path}")
-
-            if notes_path.exists():
-                pass
-            elif already_done and args.force_missing_notes:
-                generate_notes_with_codex(
-                    transcript_path=transcript_path,
-                    notes_path=notes_path,
-                    meeting_notes_prompt_path=meeting_prompt_path,
-                    run_dir=run_dir,
-                    doc_id=doc_id,
-                )
-            else:
-                generate_notes_with_codex(
-                    transcript_path=transcript_path,
-                    notes_path=notes_path,
-                    meeting_notes_prompt_path=meeting_prompt_path,
-                    run_dir=run_dir,
-                    doc_id=doc_id,
-                )
-
-            if notes_path.exists() and doc_id not in processed:
-                append_processed_docid(state_file, doc_id)
-                processed.add(doc_id)
-                processed_this_run += 1
-
-            print(
-                f"[OK] {doc_id} -> "
-                f"{transcript_path.name} | {notes_path.name}{' (forced)' if doc_id in forced else ''}"
-            )
-        except Exception as e:  # noqa: BLE001 - tool script, keep going unless fail-fast
-            errors.append(f"{doc_id}: {e}")
-            summary["errors"] += 1
-            print(f"[ERROR] {doc_id}: {e}", file=sys.stderr)
-            if args.fail_fast:
-                break
-
+    processed_this_run, errors = run_pipeline(
+        work,
+        processed=processed,
+        forced=forced,
+        importer_path=importer_path,
+        meeting_prompt_path=meeting_prompt_path,
+        out_dir=out_dir,
+        run_dir=run_dir,
+        state_file=state_file,
+        import_workers=args.import_workers,
+        notes_workers=args.notes_workers,
+        fail_fast=args.fail_fast,
+    )
+    summary["errors"] = len(errors)
     summary["processed_this_run"] = processed_this_run
     (run_dir / "summary.json").write_text(
         json.dumps(summary, indent=2, sort_keys=True) + "\n",
         encoding="utf-8",
     )
 
+    # The marks always advance. Docs that failed or were cut off by --max-docs
+    # or --fail-fast would fall behind them, so they are kept as pending and
+    # fed back in as candidates until they succeed or leave the --days window.
+    if not args.no_drive:
+        advance_discovery_state(
+            discovery_state,
+            "drive",
+            high_water=drive_high_water,
+            full_sweep=(discovery["drive"] == "full"),
+            now=now,
+        )
+    if not args.no_calendar:
+        advance_discovery_state(
+            discovery_state,
+            "calendar",
+            high_water=calendar_high_water,
+            full_sweep=(discovery["calendar"] == "full"),
+            now=now,
+        )
+    discovery_state["pending"] = {
+        cand.doc_id: cand.modified_time.astimezone(timezone.utc).isoformat() if cand.modified_time else None
+        for cand in ordered
+        if cand.doc_id not in processed
+    }
+    discovery_state["processed_digest"] = processed_digest(processed)
+    save_discovery_state(discovery_state_path, discovery_state)
+
     if errors:
         (run_dir / "errors.txt").write_text("\n".join(errors) + "\n", encoding="utf-8")
         print(f"Completed with errors ({len(errors)}). See: {run_dir / 'errors.txt'}", file=sys.stderr)
@@ -1,4 +1,7 @@
+import json
 import os
+import subprocess
+import sys
 import tempfile
 import unittest
 from datetime import datetime, timedelta, timezone
@@ -108,6 +111,270 @@ class TestSyncGeminiMeetings(unittest.TestCase):
             self.assertTrue(new_run.exists())
 
 
+FAKE_GOG = """\
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+with open(os.environ["FAKE_GOG_LOG"], "a", encoding="utf-8") as log:
+    log.write(json.dumps(sys.argv[1:]) + "\\n")
+now = datetime.now(timezone.utc)
+args = [arg for arg in sys.argv[1:] if not arg.startswith("--json") and not arg.startswith("--account")]
+options = dict(arg[2:].split("=", 1) for arg in args if arg.startswith("--") and "=" in arg)
+if args[:2] == ["drive", "search"]:
+    # FAKE_GOG_DOCS is "docId:hoursSinceModified,...", served newest first.
+    docs = [entry.split(":") for entry in os.environ["FAKE_GOG_DOCS"].split(",")]
+    docs.sort(key=lambda doc: float(doc[1]))
+    start = int(options.get("page", "0"))
+    per_page = int(options["max"])
+    files = [
+        {
+            "id": doc_id,
+            "mimeType": "application/vnd.google-apps.document",
+            "modifiedTime": (now - timedelta(hours=float(age))).isoformat().replace("+00:00", "Z"),
+            "name": f"{doc_id} - Notes by Gemini",
+        }
+        for doc_id, age in docs[start : start + per_page]
+    ]
+    payload = {"files": files}
+    if start + per_page < len(docs):
+        payload["nextPageToken"] = str(start + per_page)
+    print(json.dumps(payload))
+elif args[:2] == ["calendar", "events"]:
+    events = [
+        {
+            "status": "confirmed",
+            "summary": f"Meeting {doc_id}",
+            "description": f"https://docs.google.com/document/d/{doc_id}/edit",
+            "updated": (now - timedelta(hours=float(age))).isoformat().replace("+00:00", "Z"),
+        }
+        for doc_id, age in (entry.split(":") for entry in os.environ.get("FAKE_GOG_EVENTS", "").split(",") if entry)
+    ]
+    print(json.dumps({"events": events}))
+elif args[:2] == ["docs", "export"]:
+    doc_id = args[2]
+    time.sleep(0.1)
+    if doc_id in os.environ.get("FAKE_GOG_BROKEN", "doc-broken").split(","):
+        print("export denied", file=sys.stderr)
+        sys.exit(1)
+    out = args[args.index("--out") + 1]
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(f"Summary\\n📖 Transcript\\nAlice / {doc_id} - Transcript\\nFeb 10, 2026\\n00:00:00\\nAlice: hi\\n")
+elif args[:2] == ["docs", "info"]:
+    print(json.dumps({"document": {"title": args[2]}}))
+else:
+    sys.exit(f"unexpected gog call: {sys.argv[1:]}")
+"""
+
+FAKE_CODEX = """\
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import time
+
+sys.stdin.read()
+out = sys.argv[sys.argv.index("--output-last-message") + 1]
+with open(os.environ["FAKE_CODEX_LOG"], "a", encoding="utf-8") as log:
+    log.write(f"start {time.monotonic()}\\n")
+time.sleep(0.4)
+with open(out, "w", encoding="utf-8") as f:
+    json.dump({"notes_markdown": "# Notes"}, f)
+with open(os.environ["FAKE_CODEX_LOG"], "a", encoding="utf-8") as log:
+    log.write(f"end {time.monotonic()}\\n")
+"""
+
+
+class TestSyncPipeline(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.bin_dir = root / "bin"
+        self.bin_dir.mkdir()
+        for name, body in (("gog", FAKE_GOG), ("codex", FAKE_CODEX)):
+            path = self.bin_dir / name
+            path.write_text(body, encoding="utf-8")
+            path.chmod(0o755)
+        self.out_dir = root / "meetings"
+        self.codex_log = root / "codex.log"
+        self.gog_log = root / "gog.log"
+        self.env = {
+            **os.environ,
+            "PATH": f"{self.bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "TMPDIR": str(root / "tmp"),
+            "FAKE_CODEX_LOG": str(self.codex_log),
+            "FAKE_GOG_LOG": str(self.gog_log),
+        }
+        (root / "tmp").mkdir()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def run_sync(
+        self,
+        docs: list[str] | dict[str, float],
+        *extra: str,
+        events: dict[str, float] | None = None,
+    ) -> subprocess.CompletedProcess[str]:
+        if isinstance(docs, list):
+            # Later docs are newer.
+            docs = {doc_id: len(docs) - index for index, doc_id in enumerate(docs)}
+        calendar = ["--no-calendar"] if events is None else []
+        return subprocess.run(
+            [
+                sys.executable,
+                str(Path(sync.__file__).resolve()),
+                "--out-dir",
+                str(self.out_dir),
+                "--prune-days",
+                "0",
+                *calendar,
+                *extra,
+            ],
+            env={
+                **self.env,
+                "FAKE_GOG_DOCS": ",".join(f"{doc_id}:{age}" for doc_id, age in docs.items()),
+                "FAKE_GOG_EVENTS": ",".join(f"{doc_id}:{age}" for doc_id, age in (events or {}).items()),
+            },
+            capture_output=True,
+            text=True,
+        )
+
+    def gog_calls(self, *command: str) -> list[list[str]]:
+        calls = [json.loads(line) for line in self.gog_log.read_text(encoding="utf-8").splitlines()]
+        self.gog_log.unlink()
+        return [call for call in calls if call[1 : 1 + len(command)] == list(command)]
+
+    def summary_for(self, result: subprocess.CompletedProcess[str]) -> dict:
+        run_dir = Path(result.stdout.splitlines()[0].removeprefix("Run dir: "))
+        return json.loads((run_dir / "summary.json").read_text(encoding="utf-8"))
+
+    def test_pipeline_overlaps_notes_and_reports_in_candidate_order(self) -> None:
+        docs = ["doc-a", "doc-b", "doc-broken", "doc-c", "doc-d"]
+        result = self.run_sync(docs, "--import-workers", "3", "--notes-workers", "2")
+
+        self.assertEqual(result.returncode, 1, result.stderr)
+        self.assertIn("[ERROR] doc-broken: Importer failed for doc-broken", result.stderr)
+        # Newest modifiedTime first, regardless of which doc finished first.
+        ok_lines = [line.split()[1] for line in result.stdout.splitlines() if line.startswith("[OK]")]
+        self.assertEqual(ok_lines, ["doc-d", "doc-c", "doc-b", "doc-a"])
+
+        state = self.out_dir / ".gemini-sync" / "processed-docids.txt"
+        self.assertEqual(sorted(state.read_text(encoding="utf-8").split()), ["doc-a", "doc-b", "doc-c", "doc-d"])
+        self.assertEqual(len(list(self.out_dir.glob("*-meeting-notes-*.md"))), 4)
+        # The marks still advance; the failed doc is kept for a retry instead.
+        state = json.loads((self.out_dir / ".gemini-sync" / "discovery-state.json").read_text(encoding="utf-8"))
+        self.assertEqual(list(state["pending"]), ["doc-broken"])
+
+        events = sorted(
+            (float(stamp), kind)
+            for kind, stamp in (line.split() for line in self.codex_log.read_text(encoding="utf-8").splitlines())
+        )
+        running = peak = 0
+        for _stamp, kind in events:
+            running += 1 if kind == "start" else -1
+            peak = max(peak, running)
+        self.assertEqual(peak, 2)
+
+        summary = self.summary_for(result)
+        self.assertEqual((summary["errors"], summary["processed_this_run"]), (1, 4))
+
+        # Only the pending doc is imported again; finished ones are skipped.
+        self.env["FAKE_GOG_BROKEN"] = ""
+        rerun = self.run_sync(docs[:2])
+        self.assertEqual(rerun.returncode, 0, rerun.stderr)
+        self.assertIn("Done. Newly processed: 1", rerun.stdout)
+        ok_lines = [line.split()[1] for line in rerun.stdout.splitlines() if line.startswith("[OK]")]
+        self.assertEqual(ok_lines, ["doc-broken"])
+
+    def test_discovery_resumes_from_high_water_marks(self) -> None:
+        docs = {"recent-a": 2, "recent-b": 3, "old-a": 240, "old-b": 250, "old-c": 260, "old-d": 270}
+        events = {"cal-doc": 5}
+
+        first = self.run_sync(docs, "--per-page", "3", events=events)
+        self.assertEqual(first.returncode, 0, first.stderr)
+        self.assertEqual(self.summary_for(first)["discovery"], {"drive": "full", "calendar": "full"})
+        self.assertEqual(len(self.gog_calls("drive", "search")), 2)
+        state = json.loads((self.out_dir / ".gemini-sync" / "discovery-state.json").read_text(encoding="utf-8"))
+        self.assertEqual(set(state), {"drive", "calendar", "pending", "processed_digest"})
+
+        docs["recent-c"] = 1
+        second = self.run_sync(docs, "--per-page", "3", events=events)
+        self.assertEqual(second.returncode, 0, second.stderr)
+        summary = self.summary_for(second)
+        self.assertEqual(summary["discovery"], {"drive": "incremental", "calendar": "incremental"})
+        self.assertEqual(summary["processed_this_run"], 1)
+        calls = self.gog_calls()
+        # The second Drive page is entirely older than the mark, so the third is never requested.
+        self.assertEqual(len([call for call in calls if call[1:3] == ["drive", "search"]]), 2)
+        calendar_from = next(
+            arg for call in calls if call[1:3] == ["calendar", "events"] for arg in call if arg.startswith("--from=")
+        )
+        cal_high_water = sync._parse_rfc3339(state["calendar"]["high_water"])
+        expected_from = (cal_high_water - sync.DISCOVERY_OVERLAP).astimezone().date().isoformat()
+        self.assertEqual(calendar_from, f"--from={expected_from}")
+
+        forced_full = self.run_sync(docs, "--per-page", "3", "--full-discovery", events=events)
+        self.assertEqual(self.summary_for(forced_full)["discovery"], {"drive": "full", "calendar": "full"})
+        self.assertEqual(len(self.gog_calls("drive", "search")), 3)
+
+    def test_failed_doc_is_retried_without_blocking_incremental_discovery(self) -> None:
+        docs = {"recent-a": 2, "doc-broken": 100, "old-a": 240}
+        first = self.run_sync(docs)
+        self.assertEqual(first.returncode, 1, first.stderr)
+        self.assertEqual(self.summary_for(first)["discovery"]["drive"], "full")
+
+        # doc-broken is now older than the mark, so only the pending list brings it back.
+        docs["recent-b"] = 1
+        second = self.run_sync(docs)
+        self.assertEqual(second.returncode, 1, second.stderr)
+        summary = self.summary_for(second)
+        self.assertEqual(summary["discovery"]["drive"], "incremental")
+        self.assertEqual((summary["retried"], summary["processed_this_run"]), (1, 1))
+        self.assertIn("[ERROR] doc-broken", second.stderr)
+
+        self.env["FAKE_GOG_BROKEN"] = ""
+        third = self.run_sync(docs)
+        self.assertEqual(third.returncode, 0, third.stderr)
+        summary = self.summary_for(third)
+        self.assertEqual(summary["discovery"]["drive"], "incremental")
+        self.assertIn("[OK] doc-broken", third.stdout)
+        state = json.loads((self.out_dir / ".gemini-sync" / "discovery-state.json").read_text(encoding="utf-8"))
+        self.assertEqual(state["pending"], {})
+
+    def test_reprocessing_an_old_doc_runs_a_full_sweep(self) -> None:
+        docs = {"recent-a": 2, "old-a": 240, "old-b": 250}
+        first = self.run_sync(docs)
+        self.assertEqual(first.returncode, 0, first.stderr)
+        self.assertEqual(self.summary_for(first)["processed_this_run"], 3)
+
+        forced = self.run_sync(docs, "--force", "old-a")
+        self.assertEqual(forced.returncode, 0, forced.stderr)
+        summary = self.summary_for(forced)
+        self.assertEqual(summary["discovery"]["drive"], "full")
+        self.assertEqual(summary["to_process"], 1)
+        self.assertIn("[OK] old-a", forced.stdout)
+        self.assertIn("(forced)", forced.stdout)
+
+        self.assertEqual(self.summary_for(self.run_sync(docs))["discovery"]["drive"], "incremental")
+
+        state_file = self.out_dir / ".gemini-sync" / "processed-docids.txt"
+        kept = [line for line in state_file.read_text(encoding="utf-8").splitlines() if line != "old-b"]
+        state_file.write_text("\n".join(kept) + "\n", encoding="utf-8")
+        edited = self.run_sync(docs)
+        self.assertEqual(edited.returncode, 0, edited.stderr)
+        summary = self.summary_for(edited)
+        self.assertEqual(summary["discovery"]["drive"], "full")
+        self.assertEqual(summary["processed_this_run"], 1)
+        self.assertIn("[OK] old-b", edited.stdout)
+
+        missing_notes = self.run_sync(docs, "--force-missing-notes")
+        self.assertEqual(self.summary_for(missing_notes)["discovery"]["drive"], "full")
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -6,20 +6,36 @@
 from __future__ import annotations
 
 import argparse
+import base64
+import contextlib
 import datetime as dt
+import hashlib
+import html as html_lib
+import http.client
+import importlib.util
+import itertools
 import json
 import os
+import queue
 import re
 import shlex
+import shutil
 import subprocess
 import sys
 import textwrap
+import threading
+import time
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass, replace
+import urllib.robotparser
+import xml.etree.ElementTree as ET
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
 from html.parser import HTMLParser
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
 
 class GenerateError(RuntimeError):
@@ -121,35 +137,505 @@ class FetchResult:
     status: int
     content_type: str | None
     data: bytes
+    headers: dict[str, str] = field(default_factory=dict, compare=False)
+
+
+_USER_AGENT = "llms-txt-from-website/0.1"
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class _HttpClient:
+    """Keep-alive connection pool shared by every fetch; safe to use from threads."""
+
+    def __init__(self, *, max_idle_per_host: int = 8) -> None:
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._max_idle = max_idle_per_host
+        self._proxies = urllib.request.getproxies()
+
+    def _acquire(self, scheme: str, netloc: str, timeout_s: int) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                conn = idle.pop()
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout_s)
+                return conn, True
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=timeout_s), False
+
+    def _release(self, scheme: str, netloc: str, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self._max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _urlopen(self, url: str, method: str, headers: dict[str, str], timeout_s: int, max_bytes: int) -> FetchResult:
+        # Proxied requests go through urllib, which knows the proxy protocols.
+        req = urllib.request.Request(url, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+                return FetchResult(
+                    url=url,
+                    status=int(getattr(resp, "status", 200)),
+                    content_type=resp.headers.get("content-type"),
+                    data=resp.read(max_bytes),
+                    headers={k.lower(): v for k, v in resp.headers.items()},
+                )
+        except urllib.error.HTTPError as exc:
+            data = exc.read(max_bytes) if hasattr(exc, "read") else b""
+            return FetchResult(url=url, status=int(getattr(exc, "code", 0) or 0), content_type=None, data=data)
+
+    def _send(
+        self, p: urllib.parse.SplitResult, method: str, headers: dict[str, str], timeout_s: int
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        target = urllib.parse.urlunsplit(("", "", p.path or "/", p.query, ""))
+        for attempt in range(2):
+            conn, reused = self._acquire(p.scheme, p.netloc, timeout_s)
+            try:
+                conn.request(method, target, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # An idle keep-alive socket the server already closed: retry on a fresh one.
+                if not reused or attempt:
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+        raise AssertionError("unreachable")
+
+    def _finish(self, p: urllib.parse.SplitResult, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        # Only a fully consumed body leaves the connection reusable.
+        if resp.isclosed() and not resp.will_close:
+            self._release(p.scheme, p.netloc, conn)
+        else:
+            conn.close()
+
+    def _split(self, url: str) -> tuple[urllib.parse.SplitResult, bool]:
+        p = urllib.parse.urlsplit(url)
+        if p.scheme not in ("http", "https") or not p.netloc:
+            raise GenerateError(f"unsupported url: {url}")
+        proxied = bool(self._proxies.get(p.scheme)) and not urllib.request.proxy_bypass(p.hostname or "")
+        return p, proxied
+
+    def _request_once(
+        self, url: str, method: str, headers: dict[str, str], timeout_s: int, max_bytes: int
+    ) -> tuple[FetchResult, str | None]:
+        p, proxied = self._split(url)
+        if proxied:
+            return self._urlopen(url, method, headers, timeout_s, max_bytes), None
+
+        conn, resp = self._send(p, method, headers, timeout_s)
+        try:
+            data = resp.read(max_bytes)
+        except BaseException:
+            conn.close()
+            raise
+        self._finish(p, conn, resp)
+
+        result = FetchResult(
+            url=url,
+            status=resp.status,
+            content_type=resp.getheader("content-type"),
+            data=data,
+            headers={k.lower(): v for k, v in resp.getheaders()},
+        )
+        location = resp.getheader("location") if resp.status in _REDIRECT_STATUSES else None
+        return result, location
+
+    def request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        headers: dict[str, str] | None = None,
+        timeout_s: int = 30,
+        max_bytes: int = 2_000_000,
+        max_redirects: int = 5,
+    ) -> FetchResult:
+        hdrs = {"User-Agent": _USER_AGENT, "Accept": "text/plain,text/markdown,text/html,*/*", **(headers or {})}
+        current = url
+        for _ in range(max_redirects + 1):
+            res, location = self._request_once(current, method, hdrs, timeout_s, max_bytes)
+            if not location:
+                break
+            current = urllib.parse.urljoin(current, location)
+            if res.status == 303:
+                method = "GET"
+        return replace(res, url=url)
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout_s: int = 30,
+        max_redirects: int = 5,
+    ) -> Iterator[Any]:
+        """GET with redirects, yielding the live response so callers can read() it in chunks."""
+        hdrs = {"User-Agent": _USER_AGENT, "Accept": "*/*", **(headers or {})}
+        current = url
+        for _ in range(max_redirects + 1):
+            p, proxied = self._split(current)
+            if proxied:
+                req = urllib.request.Request(current, headers=hdrs)
+                try:
+                    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+                        yield resp
+                except urllib.error.HTTPError as exc:
+                    yield exc
+                return
+            conn, resp = self._send(p, "GET", hdrs, timeout_s)
+            location = resp.getheader("location") if resp.status in _REDIRECT_STATUSES else None
+            if location:
+                try:
+                    resp.read()
+                finally:
+                    self._finish(p, conn, resp)
+                current = urllib.parse.urljoin(current, location)
+                continue
+            try:
+                yield resp
+            finally:
+                self._finish(p, conn, resp)
+            return
+        raise GenerateError(f"too many redirects: {url}")
+
+
+_HTTP = _HttpClient()
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _cache_policy(headers: dict[str, str]) -> tuple[bool, float]:
+    """(storable, freshness seconds) from Cache-Control."""
+    directives: dict[str, str] = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _eq, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+    if "no-store" in directives:
+        return False, 0.0
+    if "no-cache" in directives:
+        return True, 0.0
+    try:
+        return True, max(0.0, float(directives.get("max-age", "0")))
+    except ValueError:
+        return True, 0.0
+
+
+class _CacheStream:
+    """A readable body served from the HTTP cache, or copied into `sink` as it is read."""
+
+    def __init__(self, status: int, source: Any, sink: Any = None) -> None:
+        self.status = status
+        self._source = source
+        self._sink = sink
+        self.digest = hashlib.sha256()
+        self.complete = False
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._source.read(size)
+        if not chunk:
+            self.complete = True
+        elif self._sink is not None:
+            self._sink.write(chunk)
+            self.digest.update(chunk)
+        return chunk
+
+
+class _HttpCache:
+    """On-disk GET cache: bodies plus ETag/Last-Modified, revalidated with conditional requests."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.stats = {"fresh_hits": 0, "not_modified": 0, "downloads": 0}
+        self._lock = threading.Lock()
+        # Sitemap <lastmod> per URL: a copy fetched after it is still current.
+        self.lastmod: dict[str, float] = {}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = _sha256(url.encode("utf-8"))
+        d = self.root / key[:2]
+        return d / f"{key}.json", d / f"{key}.body"
+
+    def _load(self, url: str, max_bytes: int) -> tuple[dict[str, Any], bytes] | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if _sha256(body) != meta.get("sha256"):
+            return None
+        # A body cut off at a smaller cap cannot answer a larger request.
+        if meta.get("truncated") and len(body) < max_bytes:
+            return None
+        return meta, body
+
+    @staticmethod
+    def _storable(status: int, headers: dict[str, str]) -> bool:
+        storable, max_age = _cache_policy(headers)
+        return status == 200 and storable and bool(headers.get("etag") or headers.get("last-modified") or max_age)
+
+    @staticmethod
+    def _new_meta(url: str, status: int, content_type: str | None, headers: dict[str, str]) -> dict[str, Any]:
+        _storable, max_age = _cache_policy(headers)
+        now = time.time()
+        return {
+            "url": url,
+            "status": status,
+            "content_type": content_type,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "fetched_at": now,
+            "fresh_until": now + max_age,
+        }
+
+    @staticmethod
+    def _validators(meta: dict[str, Any]) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _write_meta(self, url: str, meta: dict[str, Any]) -> None:
+        meta_path, _body_path = self._paths(url)
+        with contextlib.suppress(OSError):
+            _atomic_write_bytes(meta_path, json.dumps(meta, sort_keys=True).encode("utf-8"))
+
+    def _revalidated(self, url: str, meta: dict[str, Any], headers: dict[str, str]) -> None:
+        _storable, max_age = _cache_policy(headers)
+        meta["fetched_at"] = time.time()
+        meta["fresh_until"] = meta["fetched_at"] + max_age
+        self._write_meta(url, meta)
+        self._count("not_modified")
+
+    def _store(self, res: FetchResult, *, max_bytes: int) -> None:
+        if not self._storable(res.status, res.headers):
+            return
+        _meta_path, body_path = self._paths(res.url)
+        meta = self._new_meta(res.url, res.status, res.content_type, res.headers)
+        meta["sha256"] = _sha256(res.data)
+        meta["truncated"] = len(res.data) >= max_bytes
+        try:
+            _atomic_write_bytes(body_path, res.data)
+        except OSError:
+            return
+        self._write_meta(res.url, meta)
+
+    def _cached_result(self, url: str, meta: dict[str, Any], body: bytes, max_bytes: int) -> FetchResult:
+        return FetchResult(url=url, status=meta["status"], content_type=meta["content_type"], data=body[:max_bytes])
+
+    def fetch(self, url: str, *, timeout_s: int, max_bytes: int) -> FetchResult:
+        cached = self._load(url, max_bytes)
+        headers: dict[str, str] = {}
+        if cached:
+            meta, body = cached
+            modified = self.lastmod.get(url)
+            if time.time() < meta["fresh_until"] or (modified is not None and modified <= meta["fetched_at"]):
+                self._count("fresh_hits")
+                return self._cached_result(url, meta, body, max_bytes)
+            headers = self._validators(meta)
+
+        res = _HTTP.request(url, headers=headers, timeout_s=timeout_s, max_bytes=max_bytes)
+        if cached and res.status == 304:
+            meta, body = cached
+            self._revalidated(url, meta, res.headers)
+            return self._cached_result(url, meta, body, max_bytes)
+
+        self._count("downloads")
+        self._store(res, max_bytes=max_bytes)
+        return res
+
+    @contextlib.contextmanager
+    def stream(self, url: str, *, timeout_s: int = 30) -> Iterator[Any]:
+        """Like `_HttpClient.stream`, but revalidated against and copied into the cache.
+
+        Bodies are never held in memory whole: a cached body is read from disk,
+        and a new 200 body is written to the cache as the caller reads it,
+        then kept only if the caller read it to the end.
+        """
+        meta_path, body_path = self._paths(url)
+        with contextlib.ExitStack() as stack:
+            meta: dict[str, Any] | None = None
+            try:
+                loaded = json.loads(meta_path.read_text(encoding="utf-8"))
+                body = stack.enter_context(body_path.open("rb"))
+                intact = hashlib.file_digest(body, "sha256").hexdigest() == loaded.get("sha256")
+                if intact and not loaded.get("truncated"):
+                    meta = loaded
+                    body.seek(0)
+            except (OSError, ValueError):
+                meta = None
+            if meta is not None and time.time() < meta["fresh_until"]:
+                self._count("fresh_hits")
+                yield _CacheStream(meta["status"], body)
+                return
+
+            resp = stack.enter_context(
+                _HTTP.stream(url, headers=self._validators(meta) if meta else None, timeout_s=timeout_s)
+            )
+            status = int(getattr(resp, "status", 0) or 0)
+            headers = {k.lower(): v for k, v in resp.headers.items()}
+            if meta is not None and status == 304:
+                self._revalidated(url, meta, headers)
+                yield _CacheStream(meta["status"], body)
+                return
+
+            self._count("downloads")
+            if not self._storable(status, headers):
+                yield resp
+                return
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = body_path.with_name(f".{body_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with tmp.open("wb") as sink:
+                    copy = _CacheStream(status, resp, sink)
+                    yield copy
+                if copy.complete:
+                    os.replace(tmp, body_path)
+                    new_meta = self._new_meta(url, status, headers.get("content-type"), headers)
+                    new_meta["sha256"] = copy.digest.hexdigest()
+                    new_meta["truncated"] = False
+                    self._write_meta(url, new_meta)
+            finally:
+                with contextlib.suppress(OSError):
+                    tmp.unlink()
+
+
+_HTTP_CACHE: _HttpCache | None = None
 
 
 def _fetch(url: str, *, timeout_s: int = 30, max_bytes: int = 2_000_000) -> FetchResult:
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "llms-txt-from-website/0.1",
-            "Accept": "text/plain,text/markdown,text/html,*/*",
-        },
-        method="GET",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-            status = int(getattr(resp, "status", 200))
-            content_type = resp.headers.get("content-type")
-            data = resp.read(max_bytes)
-            return FetchResult(url=url, status=status, content_type=content_type, data=data)
-    except urllib.error.HTTPError as exc:
-        data = exc.read(max_bytes) if hasattr(exc, "read") else b""
-        return FetchResult(url=url, status=int(getattr(exc, "code", 0) or 0), content_type=None, data=data)
+        if _HTTP_CACHE is not None:
+            return _HTTP_CACHE.fetch(url, timeout_s=timeout_s, max_bytes=max_bytes)
+        return _HTTP.request(url, timeout_s=timeout_s, max_bytes=max_bytes)
     except Exception:
         return FetchResult(url=url, status=0, content_type=None, data=b"")
 
 
-def _url_exists(url: str) -> bool:
+class _HostLimiter:
+    """Per-origin cap on concurrent requests plus a minimum gap between request starts."""
+
+    def __init__(self, *, concurrency: int, delay_s: float) -> None:
+        self._concurrency = max(1, concurrency)
+        self._delay_s = max(0.0, delay_s)
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._delays: dict[str, float] = {}
+        self._next_start: dict[str, float] = {}
+
+    def set_delay(self, origin: str, delay_s: float) -> None:
+        with self._lock:
+            self._delays[origin] = max(self._delay_s, delay_s)
+
+    @contextlib.contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        origin = _origin(url)
+        with self._lock:
+            sem = self._slots.setdefault(origin, threading.BoundedSemaphore(self._concurrency))
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(origin, now))
+                self._next_start[origin] = start + self._delays.get(origin, self._delay_s)
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def _load_robots(origin: str) -> urllib.robotparser.RobotFileParser:
+    rp = urllib.robotparser.RobotFileParser(urllib.parse.urljoin(origin + "/", "robots.txt"))
+    res = _fetch(rp.url, max_bytes=200_000)
+    if 200 <= res.status < 300 and res.data:
+        rp.parse(res.data.decode("utf-8", errors="replace").splitlines())
+    else:
+        # Missing or unreachable robots.txt: nothing to honor.
+        rp.allow_all = True
+    return rp
+
+
+def _head_then_get(url: str) -> bool:
+    try:
+        status = _HTTP.request(url, method="HEAD", max_bytes=0).status
+    except Exception:
+        status = 0
+    if 200 <= status < 400:
+        return True
+    if status in (404, 410):
+        return False
+    # Servers that reject or mishandle HEAD (405, 501, 403, dropped connections) get a small GET.
     res = _fetch(url, max_bytes=1_000)
     return 200 <= res.status < 400
 
 
+def _urls_exist(
+    urls: Iterable[str],
+    *,
+    workers: int = 16,
+    per_host: int = 6,
+    cache_path: Path | None = None,
+    ttl_s: float = 24 * 3600,
+) -> dict[str, bool]:
+    """Check many URLs at once: HEAD with GET fallback, pooled, capped per origin.
+
+    Results younger than `ttl_s` are reused from `cache_path` (a JSON map of
+    url -> {"ok", "checked_at"}), and new results are written back to it.
+    """
+    wanted = list(dict.fromkeys(urls))
+    now = time.time()
+    cached: dict[str, dict[str, Any]] = {}
+    if cache_path is not None:
+        with contextlib.suppress(OSError, ValueError):
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+
+    out: dict[str, bool] = {}
+    todo: list[str] = []
+    for u in wanted:
+        hit = cached.get(u)
+        if isinstance(hit, dict) and now - float(hit.get("checked_at", 0)) < ttl_s:
+            out[u] = bool(hit.get("ok"))
+        else:
+            todo.append(u)
+
+    limiter = _HostLimiter(concurrency=per_host, delay_s=0.0)
+
+    def check(u: str) -> bool:
+        with limiter.slot(u):
+            return _head_then_get(u)
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+            for u, ok in zip(todo, pool.map(check, todo)):
+                out[u] = ok
+                cached[u] = {"ok": ok, "checked_at": now}
+        if cache_path is not None:
+            with contextlib.suppress(OSError):
+                _atomic_write_bytes(cache_path, json.dumps(cached, sort_keys=True).encode("utf-8"))
+    return out
+
+
 class _HtmlExtract(HTMLParser):
     def __init__(self) -> None:
         super().__init__(convert_charrefs=True)
@@ -237,27 +723,94 @@ def _discover_repo_from_site(base_url: str) -> RepoRef | None:
 
 def _git_default_branch(repo_dir: Path) -> str:
     proc = _run(["git", "-C", str(repo_dir), "rev-parse", "--abbrev-ref", "HEAD"], capture=True)
-    branch = proc.stdout.strip() or "main"
-    return branch
+    branch = proc.stdout.strip()
+    if branch == "HEAD":
+        # Detached worktree of the mirror: the mirror's own HEAD names the default branch.
+        common = _run(
+            ["git", "-C", str(repo_dir), "rev-parse", "--path-format=absolute", "--git-common-dir"], capture=True
+        ).stdout.strip()
+        proc = _run(["git", "--git-dir", common, "symbolic-ref", "--short", "HEAD"], capture=True, check=False)
+        branch = proc.stdout.strip()
+    return branch or "main"
+
+
+def _default_repo_cache() -> Path:
+    env = os.environ.get("LLMS_TXT_REPO_CACHE")
+    if env:
+        return Path(env).expanduser()
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "llms-txt-from-website" / "repos"
+
+
+def _sync_mirror(repo: RepoRef, cache_root: Path) -> Path:
+    """Bare, blob-less mirror of the repo's branches: cloned once, then only fetched."""
+    mirror = cache_root / repo.owner / f"{repo.repo}.git"
+    if (mirror / "HEAD").is_file():
+        _run(["git", "-C", str(mirror), "fetch", "--prune", "--filter=blob:none", "origin"], capture=True)
+        return mirror
+    mirror.parent.mkdir(parents=True, exist_ok=True)
+    tmp = mirror.with_name(f".{mirror.name}.{os.getpid()}.tmp")
+    try:
+        _run(["git", "clone", "--bare", "--filter=blob:none", f"{repo.url}.git", str(tmp)], capture=True)
+        # Branches only: a plain --mirror would also pull every refs/pull/* on GitHub.
+        _run(["git", "-C", str(tmp), "config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*"], capture=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    try:
+        os.replace(tmp, mirror)
+    except OSError:
+        # Another run published the mirror first.
+        shutil.rmtree(tmp, ignore_errors=True)
+    return mirror
+
 
+def _clone_repo(repo: RepoRef, dest: Path, *, cache_root: Path | None = None) -> Path:
+    """Sparse worktree of the cached mirror at `dest`, refreshed to the default branch tip.
 
-def _clone_repo(repo: RepoRef, dest: Path) -> Path:
+    The worktree starts with only top-level files checked out; call
+    `_sparse_checkout` once the docs root is known. Blobs are fetched lazily
+    into the mirror, so re-runs only download what changed.
+    """
     _require_cmd("git")
     dest.parent.mkdir(parents=True, exist_ok=True)
-    if dest.exists():
-        if (dest / ".git").is_dir():
-            return dest
+    if (dest / ".git").is_dir():
+        # Standalone clone from an older run: use as-is.
+        return dest
+    if dest.exists() and not (dest / ".git").is_file():
         raise GenerateError(f"destination already exists and is not a git repo: {dest}")
-    _run(["git", "clone", "--depth", "1", f"{repo.url}.git", str(dest)], capture=True)
+
+    mirror = _sync_mirror(repo, cache_root or _default_repo_cache())
+    proc = _run(["git", "--git-dir", str(mirror), "symbolic-ref", "--short", "HEAD"], capture=True, check=False)
+    branch = proc.stdout.strip() or "main"
+    if dest.exists():
+        _run(["git", "-C", str(dest), "checkout", "--force", "--detach", branch], capture=True)
+        return dest
+
+    _run(["git", "--git-dir", str(mirror), "worktree", "prune"], capture=True)
+    _run(["git", "--git-dir", str(mirror), "worktree", "add", "--no-checkout", "--detach", str(dest), branch], capture=True)
+    _run(["git", "-C", str(dest), "sparse-checkout", "set", "--cone"], capture=True)
+    _run(["git", "-C", str(dest), "checkout", "--detach", branch], capture=True)
     return dest
 
 
+def _sparse_checkout(repo_dir: Path, docs_root: Path) -> None:
+    """Narrow a sparse worktree to the docs root (no-op for full clones)."""
+    proc = _run(["git", "-C", str(repo_dir), "config", "--bool", "core.sparseCheckout"], capture=True, check=False)
+    if proc.stdout.strip() != "true":
+        return
+    rel = docs_root.relative_to(repo_dir.resolve()).as_posix()
+    if rel == ".":
+        _run(["git", "-C", str(repo_dir), "sparse-checkout", "disable"], capture=True)
+        return
+    _run(["git", "-C", str(repo_dir), "sparse-checkout", "set", "--cone", rel], capture=True)
+
+
 def _read_text(path: Path, *, max_bytes: int = 200_000) -> str:
     data = path.read_bytes()[:max_bytes]
     return data.decode("utf-8", errors="replace")
 
 
-def _parse_mkdocs_docs_dir(repo_dir: Path) -> Path | None:
+def _parse_mkdocs_docs_dir(repo_dir: Path, dirs: set[str]) -> Path | None:
     for name in ("mkdocs.yml", "mkdocs.yaml"):
         cfg = repo_dir / name
         if not cfg.is_file():
@@ -267,10 +820,9 @@ def _parse_mkdocs_docs_dir(repo_dir: Path) -> Path | None:
         if not m:
             continue
         raw = m.group(1).strip().strip('"').strip("'")
-        if raw:
-            p = (repo_dir / raw).resolve()
-            if p.is_dir():
-                return p
+        rel = os.path.normpath(raw).replace(os.sep, "/") if raw else ""
+        if rel in dirs:
+            return (repo_dir / rel).resolve()
     return None
 
 
@@ -293,17 +845,35 @@ _SKIP_DIR_NAMES = {
 }
 
 
-def _count_docs_files(root: Path) -> int:
-    count = 0
-    for dirpath, dirnames, filenames in os.walk(root):
-        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIR_NAMES]
-        for fn in filenames:
-            if fn.lower().endswith((".md", ".mdx", ".rst")):
-                count += 1
-    return count
+_DOCS_SUFFIXES = (".md", ".mdx", ".rst")
+
+
+def _docs_listing(repo_dir: Path) -> list[str]:
+    """Repo-relative paths of docs files, read from git's tree so nothing needs checking out."""
+    names: list[str] = []
+    proc = _run(["git", "-C", str(repo_dir), "ls-tree", "-r", "--name-only", "-z", "HEAD"], capture=True, check=False)
+    if proc.returncode == 0:
+        names = [n for n in proc.stdout.split("\0") if n]
+    else:
+        for dirpath, dirnames, filenames in os.walk(repo_dir):
+            dirnames[:] = [d for d in dirnames if d not in _SKIP_DIR_NAMES]
+            rel = Path(dirpath).relative_to(repo_dir)
+            names.extend((rel / fn).as_posix() for fn in filenames)
+    return [
+        n
+        for n in names
+        if n.lower().endswith(_DOCS_SUFFIXES) and not any(part in _SKIP_DIR_NAMES for part in n.split("/")[:-1])
+    ]
+
+
+def _count_docs_files(listing: list[str], rel_dir: str) -> int:
+    prefix = rel_dir.strip("/") + "/"
+    return sum(1 for n in listing if n.startswith(prefix))
 
 
 def _find_docs_root(repo_dir: Path, *, base_url: str) -> Path | None:
+    listing = _docs_listing(repo_dir)
+    dirs = {"/".join(parts[:i]) for parts in (n.split("/") for n in listing) for i in range(1, len(parts))}
     base_path = urllib.parse.urlsplit(base_url).path.strip("/")
     base_parts = [p for p in base_path.split("/") if p]
 
@@ -320,49 +890,34 @@ def _find_docs_root(repo_dir: Path, *, base_url: str) -> Path | None:
             if rel in seen_rel:
                 continue
             seen_rel.add(rel)
-            p = (repo_dir / rel).resolve()
-            if not p.is_dir():
+            if rel not in dirs:
                 continue
-            if _count_docs_files(p) >= 3:
-                return p
+            if _count_docs_files(listing, rel) >= 3:
+                return (repo_dir / rel).resolve()
 
-    mkdocs_docs = _parse_mkdocs_docs_dir(repo_dir)
+    mkdocs_docs = _parse_mkdocs_docs_dir(repo_dir, dirs)
     if mkdocs_docs:
         return mkdocs_docs
 
-    preferred = [repo_dir / p for p in ("docs", "doc", "documentation", "website", "site", "content")]
-    candidates: list[Path] = [p for p in preferred if p.is_dir()]
+    candidates = [p for p in ("docs", "doc", "documentation", "website", "site", "content") if p in dirs]
 
     # Also look for nested "docs" dirs (mono-repos).
     max_depth = 4
-    for dirpath, dirnames, _filenames in os.walk(repo_dir):
-        rel = Path(dirpath).relative_to(repo_dir)
-        if len(rel.parts) > max_depth:
-            dirnames[:] = []
-            continue
-        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIR_NAMES]
-        for d in list(dirnames):
-            if d.lower() in ("docs", "doc", "documentation"):
-                candidates.append(Path(dirpath) / d)
-
-    seen: set[Path] = set()
-    uniq: list[Path] = []
-    for c in candidates:
-        c = c.resolve()
-        if c in seen:
-            continue
-        seen.add(c)
-        uniq.append(c)
+    for d in sorted(dirs):
+        parts = d.split("/")
+        if len(parts) <= max_depth + 1 and parts[-1].lower() in ("docs", "doc", "documentation"):
+            candidates.append(d)
 
+    uniq = list(dict.fromkeys(candidates))
     if not uniq:
         return None
 
-    scored = [(c, _count_docs_files(c)) for c in uniq]
-    scored.sort(key=lambda t: (-t[1], len(t[0].parts)))
+    scored = [(c, _count_docs_files(listing, c)) for c in uniq]
+    scored.sort(key=lambda t: (-t[1], len(t[0].split("/"))))
     best, best_count = scored[0]
     if best_count == 0:
         return None
-    return best
+    return (repo_dir / best).resolve()
 
 
 def _iter_docs_files(docs_root: Path) -> list[Path]:
@@ -370,7 +925,7 @@ def _iter_docs_files(docs_root: Path) -> list[Path]:
     for dirpath, dirnames, filenames in os.walk(docs_root):
         dirnames[:] = [d for d in dirnames if d not in _SKIP_DIR_NAMES]
         for fn in filenames:
-            if fn.lower().endswith((".md", ".mdx", ".rst")):
+            if fn.lower().endswith(_DOCS_SUFFIXES):
                 files.append(Path(dirpath) / fn)
     files.sort()
     return files
@@ -630,24 +1185,179 @@ def _find_sitemaps(base_url: str) -> list[str]:
     return uniq
 
 
-def _parse_sitemap_xml(xml_bytes: bytes) -> list[str]:
+def _parse_lastmod(value: str | None) -> float | None:
+    """W3C datetime (a date, or a datetime with offset) to epoch seconds.
+
+    A bare date says only that the page changed at some point that day, so it
+    maps to the end of the day: a copy fetched earlier that day is not current.
+    """
+    if not value:
+        return None
+    value = value.strip()
     try:
-        txt = xml_bytes.decode("utf-8", errors="replace")
-    except Exception:
-        return []
-    locs = re.findall(r"<loc>\\s*([^<\\s]+)\\s*</loc>", txt)
-    out: list[str] = []
-    seen: set[str] = set()
-    for u in locs:
-        u = _url_without_query_fragment(u)
-        if not u or u in seen:
-            continue
-        seen.add(u)
-        out.append(u)
-    return out
+        if len(value) == 10:
+            day = dt.date.fromisoformat(value) + dt.timedelta(days=1)
+            stamp = dt.datetime.combine(day, dt.time.min, tzinfo=dt.timezone.utc)
+        else:
+            stamp = dt.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=dt.timezone.utc)
+    return stamp.timestamp()
+
+
+@dataclass
+class _SitemapDoc:
+    """What one sitemap document yielded: page entries and nested sitemap URLs."""
+
+    url: str
+    entries: list[tuple[str, float | None]] = field(default_factory=list)
+    children: list[str] = field(default_factory=list)
 
 
-def _crawl_internal(base_url: str, *, max_pages: int, max_depth: int) -> list[str]:
+_SITEMAP_CHUNK = 64 * 1024
+
+
+def _read_sitemap(url: str, accept: Any = None, *, timeout_s: int = 30) -> _SitemapDoc:
+    """Stream one sitemap (plain or gzip) through an incremental XML parser.
+
+    Elements are cleared as soon as their <url>/<sitemap> closes, so memory is
+    bounded by the entries kept, not by the document size. A malformed or cut-off
+    document keeps whatever parsed before the error.
+    """
+    doc = _SitemapDoc(url=url)
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root: ET.Element | None = None
+
+    def drain() -> None:
+        nonlocal root
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+            tag = elem.tag.rpartition("}")[2]
+            if tag not in ("url", "sitemap"):
+                continue
+            loc = lastmod = None
+            for child in elem:
+                name = child.tag.rpartition("}")[2]
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = child.text
+            if loc and loc.startswith("http"):
+                loc = _url_without_query_fragment(urllib.parse.urljoin(url, loc))
+                if tag == "sitemap":
+                    doc.children.append(loc)
+                elif accept is None or accept(loc):
+                    doc.entries.append((loc, _parse_lastmod(lastmod)))
+            if root is not None:
+                root.clear()
+
+    try:
+        opener = _HTTP_CACHE.stream if _HTTP_CACHE is not None else _HTTP.stream
+        with opener(url, timeout_s=timeout_s) as resp:
+            if not (200 <= int(getattr(resp, "status", 0) or 0) < 300):
+                return doc
+            inflate: Any = None
+            first = True
+            while chunk := resp.read(_SITEMAP_CHUNK):
+                if first:
+                    first = False
+                    # .xml.gz files are served both raw and with Content-Encoding; sniff the magic.
+                    if chunk[:2] == b"\x1f\x8b":
+                        inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                if inflate is None:
+                    parser.feed(chunk)
+                    drain()
+                    continue
+                data = inflate.decompress(chunk, _SITEMAP_CHUNK)
+                while True:
+                    parser.feed(data)
+                    drain()
+                    if not inflate.unconsumed_tail:
+                        break
+                    data = inflate.decompress(inflate.unconsumed_tail, _SITEMAP_CHUNK)
+            parser.close()
+            drain()
+    except (ET.ParseError, zlib.error, OSError, http.client.HTTPException, GenerateError):
+        pass
+    return doc
+
+
+def _collect_sitemap_urls(
+    base_url: str,
+    *,
+    accept: Any = None,
+    workers: int = 4,
+    per_host: int = 2,
+    max_sitemaps: int = 1000,
+) -> dict[str, float | None]:
+    """Every page URL reachable from the site's sitemaps, mapped to its lastmod.
+
+    Sitemap indexes are followed breadth-first with a bounded pool; URLs keep
+    first-seen order and are deduped, with the newest lastmod winning.
+    """
+    found: dict[str, float | None] = {}
+    seen: set[str] = set()
+    frontier: deque[str] = deque()
+    for sm in _find_sitemaps(base_url):
+        if sm not in seen:
+            seen.add(sm)
+            frontier.append(sm)
+
+    limiter = _HostLimiter(concurrency=per_host, delay_s=0.0)
+
+    def read(url: str) -> _SitemapDoc:
+        with limiter.slot(url):
+            return _read_sitemap(url, accept)
+
+    order = itertools.count()
+    done_docs: dict[int, _SitemapDoc] = {}
+    next_merge = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        inflight: dict[Any, int] = {}
+        while frontier or inflight:
+            while frontier and len(inflight) < workers:
+                inflight[pool.submit(read, frontier.popleft())] = next(order)
+            done, _pending = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                done_docs[inflight.pop(fut)] = fut.result()
+            # Merge in submission order so the output does not depend on timing.
+            while next_merge in done_docs:
+                doc = done_docs.pop(next_merge)
+                next_merge += 1
+                for child in doc.children:
+                    if child not in seen and len(seen) < max_sitemaps:
+                        seen.add(child)
+                        frontier.append(child)
+                for loc, lastmod in doc.entries:
+                    if loc not in found:
+                        found[loc] = lastmod
+                    elif lastmod is not None and (found[loc] is None or lastmod > found[loc]):
+                        found[loc] = lastmod
+    return found
+
+
+_HREF_RE = re.compile(r"""<(?:a|link)\b[^>]*?\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+
+
+def _extract_hrefs(html: str) -> list[str]:
+    # Crawling only needs hrefs; a regex pass is far cheaper than a full HTMLParser feed.
+    return [html_lib.unescape(next(g for g in m.groups() if g is not None)) for m in _HREF_RE.finditer(html)]
+
+
+def _crawl_internal(
+    base_url: str,
+    *,
+    max_pages: int,
+    max_depth: int,
+    workers: int = 8,
+    per_host: int = 4,
+    delay_s: float = 0.0,
+) -> list[str]:
     origin = _origin(base_url)
     base_path = urllib.parse.urlsplit(base_url).path
     base_prefix = base_path if base_path.endswith("/") else base_path + "/"
@@ -660,48 +1370,67 @@ def _crawl_internal(base_url: str, *, max_pages: int, max_depth: int) -> list[st
             return False
         if not p.path.startswith(base_prefix):
             return False
-        if re.search(r"\\.(png|jpg|jpeg|gif|svg|css|js|pdf|zip|gz|tgz)(?:$|\\?)", u, re.I):
+        if re.search(r"\.(png|jpg|jpeg|gif|svg|css|js|pdf|zip|gz|tgz)(?:$|\?)", u, re.I):
             return False
         return True
 
-    start = _url_without_query_fragment(base_url)
-    q: list[tuple[str, int]] = [(start, 0)]
-    seen: set[str] = set()
-    out: list[str] = []
+    def canon(u: str) -> str:
+        return _url_without_query_fragment(u).rstrip("/")
 
-    while q and len(out) < max_pages:
-        url, depth = q.pop(0)
-        canon = _url_without_query_fragment(url).rstrip("/")
-        if canon in seen:
-            continue
-        seen.add(canon)
-        res = _fetch(url, max_bytes=600_000)
+    robots = _load_robots(origin)
+    limiter = _HostLimiter(concurrency=per_host, delay_s=delay_s)
+    limiter.set_delay(origin, float(robots.crawl_delay(_USER_AGENT) or 0))
+
+    def visit(url: str, want_links: bool) -> tuple[bool, list[str]]:
+        with limiter.slot(url):
+            res = _fetch(url, max_bytes=600_000)
         if not (200 <= res.status < 400):
-            continue
+            return False, []
         ct = (res.content_type or "").lower()
         if "text/html" not in ct and ct:
-            continue
-        out.append(url)
-        if depth >= max_depth:
-            continue
-        try:
-            html = res.data.decode("utf-8", errors="replace")
-        except Exception:
-            continue
-        parser = _HtmlExtract()
-        parser.feed(html)
-        for href in parser.links:
-            abs_u = urllib.parse.urljoin(url, href)
-            abs_u = _url_without_query_fragment(abs_u)
-            if not allow(abs_u):
-                continue
-            q.append((abs_u, depth + 1))
-
-    return out
-
+            return False, []
+        if not want_links:
+            return True, []
+        html = res.data.decode("utf-8", errors="replace")
+        return True, [_url_without_query_fragment(urllib.parse.urljoin(url, href)) for href in _extract_hrefs(html)]
 
-def _rank_urls_for_llms(urls: list[str], base_url: str) -> list[str]:
-    # Keep internal + prefer docs-ish paths.
+    start = _url_without_query_fragment(base_url)
+    frontier: deque[tuple[str, int]] = deque([(start, 0)])
+    seen: set[str] = {canon(start)}
+    found: list[tuple[int, str]] = []
+    order = itertools.count()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        inflight: dict[Any, tuple[int, str, int]] = {}
+        while (frontier or inflight) and len(found) < max_pages:
+            # Never have more pages in flight than could still be kept.
+            while frontier and len(inflight) < workers and len(found) + len(inflight) < max_pages:
+                url, depth = frontier.popleft()
+                if not robots.can_fetch(_USER_AGENT, url):
+                    continue
+                inflight[pool.submit(visit, url, depth < max_depth)] = (next(order), url, depth)
+            if not inflight:
+                break
+            done, _pending = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                n, url, depth = inflight.pop(fut)
+                ok, links = fut.result()
+                if not ok:
+                    continue
+                found.append((n, url))
+                for link in links:
+                    c = canon(link)
+                    if c in seen or not allow(link):
+                        continue
+                    seen.add(c)
+                    frontier.append((link, depth + 1))
+
+    found.sort()
+    return [u for _n, u in found[:max_pages]]
+
+
+def _scope_filter(base_url: str) -> Any:
+    """Predicate: same origin and under the base URL's path."""
     origin = _origin(base_url)
     base_path = urllib.parse.urlsplit(base_url).path
     base_prefix = base_path if base_path.endswith("/") else base_path + "/"
@@ -712,7 +1441,16 @@ def _rank_urls_for_llms(urls: list[str], base_url: str) -> list[str]:
             return False
         return p.path.startswith(base_prefix)
 
+    return allow
+
+
+def _rank_urls_for_llms(
+    urls: Iterable[str], base_url: str, lastmod: dict[str, float | None] | None = None
+) -> list[str]:
+    # Keep internal + prefer docs-ish paths; among equals, prefer recently modified.
+    allow = _scope_filter(base_url)
     filtered = [u for u in urls if allow(u)]
+    modified = lastmod or {}
 
     def score(u: str) -> int:
         p = urllib.parse.urlsplit(u)
@@ -738,7 +1476,7 @@ def _rank_urls_for_llms(urls: list[str], base_url: str) -> list[str]:
         s += max(0, 12 - depth)
         return s
 
-    scored = sorted(filtered, key=lambda u: (-score(u), u))
+    scored = sorted(filtered, key=lambda u: (-score(u), -(modified.get(u) or 0.0), u))
     uniq: list[str] = []
     seen: set[str] = set()
     for u in scored:
@@ -750,48 +1488,314 @@ def _rank_urls_for_llms(urls: list[str], base_url: str) -> list[str]:
     return uniq
 
 
-def _convert_url_to_markdown(url: str) -> str:
-    url = _url_without_query_fragment(url)
+_MARKITDOWN_WORKER = r"""
+import base64, io, json, sys
+from markitdown import MarkItDown
 
-    # If the URL already looks like raw text, fetch it directly.
-    path = urllib.parse.urlsplit(url).path.lower()
-    if path.endswith((".md", ".markdown", ".rst", ".txt")):
-        res = _fetch(url, max_bytes=2_000_000)
-        if 200 <= res.status < 400 and res.data:
-            return res.data.decode("utf-8", errors="replace")
+out, sys.stdout = sys.stdout, sys.stderr  # keep library chatter off the protocol stream
+converter = MarkItDown()
+for line in sys.stdin:
+    req = json.loads(line)
+    try:
+        res = converter.convert_stream(io.BytesIO(base64.b64decode(req["html"])), file_extension=".html", url=req["url"])
+        reply = {"ok": True, "markdown": res.text_content or ""}
+    except Exception as exc:
+        reply = {"ok": False, "error": str(exc)}
+    out.write(json.dumps(reply) + "\n")
+    out.flush()
+"""
 
-    # Prefer a ".md" endpoint if it exists (common llms.txt convention).
-    p = urllib.parse.urlsplit(url)
-    if p.path not in ("", "/"):
-        md_url = urllib.parse.urlunsplit((p.scheme, p.netloc, p.path.rstrip("/") + ".md", "", ""))
-        if _url_exists(md_url):
-            res = _fetch(md_url, max_bytes=2_000_000)
-            if 200 <= res.status < 400 and res.data:
-                return res.data.decode("utf-8", errors="replace")
 
-    # Use markitdown (via uvx) as a robust HTML -> markdown converter.
-    _require_cmd("uvx")
-    proc = _run(["uvx", "markitdown", url], capture=True, check=False)
-    if proc.returncode == 0 and proc.stdout.strip():
-        return proc.stdout
+class _MarkitdownWorkers:
+    """Persistent markitdown processes converting already-fetched HTML sent as JSON lines."""
 
-    # Last resort: raw HTML (still better than nothing).
-    res = _fetch(url, max_bytes=2_000_000)
+    def __init__(self) -> None:
+        self._cmd = self._worker_cmd()
+        self._idle: queue.SimpleQueue[subprocess.Popen[str]] = queue.SimpleQueue()
+        self._procs: list[subprocess.Popen[str]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _worker_cmd() -> list[str] | None:
+        if importlib.util.find_spec("markitdown"):
+            return [sys.executable, "-c", _MARKITDOWN_WORKER]
+        if _shutil_which("uv"):
+            return ["uv", "run", "--quiet", "--no-project", "--with", "markitdown", "python", "-c", _MARKITDOWN_WORKER]
+        return None
+
+    @property
+    def available(self) -> bool:
+        return self._cmd is not None
+
+    def _checkout(self) -> subprocess.Popen[str]:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        assert self._cmd is not None
+        proc = subprocess.Popen(
+            self._cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+        )
+        with self._lock:
+            self._procs.append(proc)
+        return proc
+
+    def convert(self, url: str, html: bytes) -> str | None:
+        if not self.available:
+            return None
+        proc = self._checkout()
+        try:
+            assert proc.stdin is not None and proc.stdout is not None
+            proc.stdin.write(json.dumps({"url": url, "html": base64.b64encode(html).decode("ascii")}) + "\n")
+            proc.stdin.flush()
+            reply = json.loads(proc.stdout.readline())
+        except (OSError, ValueError):
+            proc.kill()
+            return None
+        self._idle.put(proc)
+        return reply["markdown"] if reply.get("ok") else None
+
+    def close(self) -> None:
+        with self._lock:
+            procs, self._procs = self._procs, []
+        for proc in procs:
+            with contextlib.suppress(OSError):
+                if proc.stdin:
+                    proc.stdin.close()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def _markdown_text(res: FetchResult) -> str | None:
     if 200 <= res.status < 400 and res.data:
         return res.data.decode("utf-8", errors="replace")
-    return ""
+    return None
 
 
-def _build_llms_full_from_urls(urls: list[LinkItem], out_path: Path) -> None:
-    parts: list[str] = []
-    for it in urls:
-        md = _convert_url_to_markdown(it.url)
-        if not md.strip():
-            continue
-        parts.append(f"# {it.title}\n\nSource: {it.url}\n\n{md.strip()}\n")
-        parts.append("\n---\n")
-    data = "\n".join(parts).rstrip() + "\n"
-    _write_file(out_path, data)
+def _markdown_variant_url(url: str) -> str | None:
+    p = urllib.parse.urlsplit(url)
+    if p.path in ("", "/"):
+        return None
+    return urllib.parse.urlunsplit((p.scheme, p.netloc, p.path.rstrip("/") + ".md", "", ""))
+
+
+def _convert_url_to_markdown(
+    url: str,
+    *,
+    workers: _MarkitdownWorkers | None = None,
+    md_cache: _MarkdownCache | None = None,
+    reuse_cached: bool = False,
+) -> tuple[str, bool]:
+    """Markdown for one page, and whether it came from the conversion cache."""
+    url = _url_without_query_fragment(url)
+
+    # Raw text URLs and ".md" endpoints (common llms.txt convention) need no conversion.
+    if urllib.parse.urlsplit(url).path.lower().endswith((".md", ".markdown", ".rst", ".txt")):
+        md = _markdown_text(_fetch(url, max_bytes=2_000_000))
+        if md is not None:
+            return md, False
+
+    # Probe "<page>.md" unless the previous run found none for these exact page bytes.
+    md_url = _markdown_variant_url(url)
+    page: FetchResult | None = None
+    probe = md_url is not None
+    if probe and md_cache is not None:
+        without_variant = md_cache.without_variant(url)
+        if without_variant is not None:
+            page = _fetch(url, max_bytes=2_000_000)
+            probe = not (page.data and _sha256(page.data) == without_variant)
+    if md_url is not None and probe:
+        md = _markdown_text(_fetch(md_url, max_bytes=2_000_000))
+        if md is not None:
+            return md, False
+
+    # Convert the page bytes we fetch anyway (usually already in the HTTP cache).
+    if page is None:
+        page = _fetch(url, max_bytes=2_000_000)
+    if not (200 <= page.status < 400 and page.data):
+        return "", False
+    source_sha = _sha256(page.data)
+    if md_url is not None and md_cache is not None:
+        md_cache.note_without_variant(url, source_sha)
+    if md_cache is not None and reuse_cached:
+        cached = md_cache.get(source_sha)
+        if cached is not None:
+            return cached, True
+
+    converted = workers.convert(url, page.data) if workers else None
+    if converted is None:
+        # No persistent worker available: one-shot markitdown (re-downloads the page).
+        _require_cmd("uvx")
+        proc = _run(["uvx", "markitdown", url], capture=True, check=False)
+        converted = proc.stdout if proc.returncode == 0 else ""
+    if converted.strip():
+        if md_cache is not None:
+            md_cache.put(source_sha, converted)
+        return converted, False
+
+    # Last resort: raw HTML (still better than nothing).
+    return page.data.decode("utf-8", errors="replace"), False
+
+
+class _MarkdownCache:
+    """Converted Markdown keyed by the sha256 of the page bytes it was converted from."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, source_sha: str) -> Path:
+        return self.root / source_sha[:2] / f"{source_sha}.md"
+
+    def get(self, source_sha: str) -> str | None:
+        try:
+            return self._path(source_sha).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, source_sha: str, md: str) -> None:
+        with contextlib.suppress(OSError):
+            _atomic_write_bytes(self._path(source_sha), md.encode("utf-8"))
+
+    def _without_variant_path(self, url: str) -> Path:
+        key = _sha256(url.encode("utf-8"))
+        return self.root / "without-variant" / key[:2] / key
+
+    def without_variant(self, url: str) -> str | None:
+        """sha256 of the page bytes for which the last probe found no ".md" variant."""
+        try:
+            return self._without_variant_path(url).read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+    def note_without_variant(self, url: str, source_sha: str) -> None:
+        if self.without_variant(url) == source_sha:
+            return
+        with contextlib.suppress(OSError):
+            _atomic_write_bytes(self._without_variant_path(url), source_sha.encode("utf-8"))
+
+
+@dataclass(frozen=True)
+class ConvertOptions:
+    md_cache: _MarkdownCache | None = None
+    refresh_changed: bool = False
+    workers: int = 4
+    # Byte budget for llms-full.txt; None means unlimited.
+    max_bytes: int | None = None
+
+
+def _manifest_path(out_path: Path) -> Path:
+    return out_path.with_name(out_path.stem + ".manifest.json")
+
+
+def _write_manifest(out_path: Path, total_bytes: int, sections: list[dict[str, Any]]) -> None:
+    manifest = {"file": out_path.name, "bytes": total_bytes, "sections": sections}
+    _atomic_write_bytes(_manifest_path(out_path), (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+
+
+class _FullWriter:
+    """Appends llms-full.txt sections to disk as they arrive, recording byte offsets.
+
+    The file is written to a temp path and renamed on close(), next to a
+    `<stem>.manifest.json` listing each section's title, source, offset and length.
+    """
+
+    _SEPARATOR = b"\n\n---\n"
+
+    def __init__(self, out_path: Path, *, max_bytes: int | None = None) -> None:
+        self.out_path = out_path
+        self.max_bytes = max_bytes
+        self.sections: list[dict[str, Any]] = []
+        self.full = False
+        self._tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self._tmp.open("wb")
+        self._size = 0
+
+    def add(self, title: str, url: str, md: str) -> bool:
+        """Append one section; False (and nothing written) once it would exceed the budget."""
+        if self.full:
+            return False
+        body = f"# {title}\n\nSource: {url}\n\n{md.strip()}\n".encode("utf-8")
+        lead = b"\n" if self.sections else b""
+        need = len(lead) + len(body) + len(self._SEPARATOR)
+        if self.max_bytes is not None and self._size + need > self.max_bytes:
+            self.full = True
+            return False
+        self._fh.write(lead)
+        offset = self._size + len(lead)
+        self._fh.write(body + self._SEPARATOR)
+        self._size = offset + len(body) + len(self._SEPARATOR)
+        self.sections.append({"title": title, "source": url, "offset": offset, "length": len(body)})
+        return True
+
+    def close(self) -> int:
+        if not self.sections:
+            self._fh.write(b"\n")
+            self._size = 1
+        self._fh.close()
+        os.replace(self._tmp, self.out_path)
+        _write_manifest(self.out_path, self._size, self.sections)
+        return self._size
+
+    def abort(self) -> None:
+        self._fh.close()
+        with contextlib.suppress(OSError):
+            self._tmp.unlink()
+
+
+def _build_llms_full_from_urls(
+    urls: list[LinkItem],
+    out_path: Path,
+    *,
+    options: ConvertOptions = ConvertOptions(),
+) -> dict[str, Any]:
+    workers = _MarkitdownWorkers()
+    writer = _FullWriter(out_path, max_bytes=options.max_bytes)
+    window = max(1, options.workers) * 2
+
+    def convert(it: LinkItem) -> tuple[str, bool]:
+        return _convert_url_to_markdown(
+            it.url, workers=workers, md_cache=options.md_cache, reuse_cached=options.refresh_changed
+        )
+
+    converted = reused = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, options.workers)) as pool:
+            # Reorder buffer: pages finish in any order but are written in ranked order,
+            # and at most `window` conversions are held in memory at once.
+            pending: dict[int, Any] = {}
+            submitted = written = 0
+            while written < len(urls) and not writer.full:
+                while submitted < len(urls) and submitted - written < window:
+                    pending[submitted] = pool.submit(convert, urls[submitted])
+                    submitted += 1
+                md, was_reused = pending.pop(written).result()
+                it = urls[written]
+                written += 1
+                converted += not was_reused
+                reused += was_reused
+                if md.strip():
+                    writer.add(it.title, it.url, md)
+            for fut in pending.values():
+                fut.cancel()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        workers.close()
+
+    writer.close()
+    stats: dict[str, Any] = {"converted_pages": converted, "reused_pages": reused, "sections": len(writer.sections)}
+    if writer.full:
+        stats["budget_reached"] = True
+    return stats
 
 
 def _repomix_files(file_paths: list[Path], out_path: Path, *, header: str | None) -> None:
@@ -811,6 +1815,31 @@ def _repomix_files(file_paths: list[Path], out_path: Path, *, header: str | None
     _run(args, capture=True, check=True, input_text=stdin)
 
 
+_REPOMIX_RULE_RE = re.compile(rb"^={16,}\r?\n$")
+
+
+def _repomix_sections(out_path: Path) -> list[dict[str, Any]]:
+    """Byte offsets of each `File:` block in repomix plain output, read line by line."""
+    sections: list[dict[str, Any]] = []
+    window: deque[tuple[int, bytes]] = deque(maxlen=3)
+    offset = 0
+    with out_path.open("rb") as fh:
+        for line in fh:
+            window.append((offset, line))
+            offset += len(line)
+            if len(window) < 3:
+                continue
+            (start, rule1), (_o, label), (_o2, rule2) = window
+            if _REPOMIX_RULE_RE.match(rule1) and _REPOMIX_RULE_RE.match(rule2) and label.startswith(b"File: "):
+                if sections:
+                    sections[-1]["length"] = start - sections[-1]["offset"]
+                path = label[len(b"File: ") :].decode("utf-8", errors="replace").strip()
+                sections.append({"title": path, "source": path, "offset": start, "length": 0})
+    if sections:
+        sections[-1]["length"] = offset - sections[-1]["offset"]
+    return sections
+
+
 def _build_llms_full_from_repo(
     repo_dir: Path,
     repo: RepoRef,
@@ -851,6 +1880,7 @@ def _build_llms_full_from_repo(
         """
     ).strip()
     _repomix_files([p.resolve() for p in chosen], out_path, header=header)
+    _write_manifest(out_path, out_path.stat().st_size, _repomix_sections(out_path))
     return {"scope_used": scope_used, "docs_files": len(chosen), "estimated_bytes": total_bytes}
 
 
@@ -863,6 +1893,7 @@ def _generate_from_repo(
     max_full_bytes: int,
     force_full: bool,
     include_source_links: bool,
+    repo_cache: Path | None = None,
 ) -> dict[str, Any] | None:
     repo = _discover_repo_from_site(base_url)
     if not repo:
@@ -870,12 +1901,13 @@ def _generate_from_repo(
 
     sources_dir = out_dir / "sources"
     repo_dir = sources_dir / f"repo-{repo.owner}-{repo.repo}"
-    _clone_repo(repo, repo_dir)
+    _clone_repo(repo, repo_dir, cache_root=repo_cache)
     branch = _git_default_branch(repo_dir)
 
     docs_root = _find_docs_root(repo_dir, base_url=base_url)
     if not docs_root:
         raise GenerateError(f"cloned repo but could not find docs root: {repo.url}")
+    _sparse_checkout(repo_dir, docs_root)
 
     docs_files = _iter_docs_files(docs_root)
     if not docs_files:
@@ -904,9 +1936,13 @@ def _generate_from_repo(
         curated_paths.append(md_path)
 
     curated = _select_top_links(items, max_links=max_links)
+    live = _urls_exist(
+        (it.site_url for it in curated if it.site_url),
+        cache_path=sources_dir / "link-check.json",
+    )
     curated_final: list[LinkItem] = []
     for it in curated:
-        if it.site_url and _url_exists(it.site_url):
+        if it.site_url and live.get(it.site_url):
             curated_final.append(replace(it, url=it.site_url))
         else:
             curated_final.append(it)
@@ -947,7 +1983,13 @@ def _generate_from_repo(
     }
 
 
-def _generate_from_existing_llms(base_url: str, out_dir: Path, *, max_pages: int) -> dict[str, Any] | None:
+def _generate_from_existing_llms(
+    base_url: str,
+    out_dir: Path,
+    *,
+    max_pages: int,
+    convert: ConvertOptions = ConvertOptions(),
+) -> dict[str, Any] | None:
     origin = _origin(base_url)
     candidates = []
     for root in [base_url, origin + "/"]:
@@ -992,7 +2034,12 @@ def _generate_from_existing_llms(base_url: str, out_dir: Path, *, max_pages: int
     links = _extract_md_links(llms_txt_text, base_url=llms_txt_url or base_url)
 
     if llms_full_bytes:
-        _write_file(out_dir / "llms-full.txt", llms_full_bytes)
+        full_path = out_dir / "llms-full.txt"
+        _write_file(full_path, llms_full_bytes)
+        # The site's own file has no known section boundaries; describe it as one section
+        # so a manifest from an earlier crawl run never points into these bytes.
+        section = {"title": full_path.name, "source": llms_full_url, "offset": 0, "length": len(llms_full_bytes)}
+        _write_manifest(full_path, len(llms_full_bytes), [section])
         return {
             "method": "existing_llms",
             "llms_txt_url": llms_txt_url,
@@ -1005,13 +2052,13 @@ def _generate_from_existing_llms(base_url: str, out_dir: Path, *, max_pages: int
     items: list[LinkItem] = []
     for u in links[:max_pages]:
         items.append(LinkItem(title=_title_from_url(u), url=u, category="Docs"))
-    _build_llms_full_from_urls(items, out_dir / "llms-full.txt")
+    full_stats = _build_llms_full_from_urls(items, out_dir / "llms-full.txt", options=convert)
     return {
         "method": "existing_llms",
         "llms_txt_url": llms_txt_url,
         "llms_full_url": None,
         "llms_links": len(links),
-        "full": {"source": "generated_from_links", "converted_pages": len(items)},
+        "full": {"source": "generated_from_links", **full_stats},
     }
 
 
@@ -1022,23 +2069,29 @@ def _generate_from_sitemap_or_crawl(
     max_pages: int,
     max_depth: int,
     max_links: int,
+    crawl_workers: int = 8,
+    crawl_per_host: int = 4,
+    crawl_delay: float = 0.0,
+    convert: ConvertOptions = ConvertOptions(),
 ) -> dict[str, Any]:
-    urls: list[str] = []
-
-    # 1) sitemap(s)
-    for sm in _find_sitemaps(base_url):
-        res = _fetch(sm, max_bytes=2_000_000)
-        if not (200 <= res.status < 400) or not res.data:
-            continue
-        urls = _parse_sitemap_xml(res.data)
-        if urls:
-            break
+    # 1) sitemap(s), following sitemap indexes; only in-scope URLs are kept.
+    lastmod = _collect_sitemap_urls(base_url, accept=_scope_filter(base_url))
+    urls = list(lastmod)
+    if _HTTP_CACHE is not None:
+        _HTTP_CACHE.lastmod.update({u: t for u, t in lastmod.items() if t is not None})
 
     method = "sitemap" if urls else "crawl"
     if not urls:
-        urls = _crawl_internal(base_url, max_pages=max_pages, max_depth=max_depth)
+        urls = _crawl_internal(
+            base_url,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            workers=crawl_workers,
+            per_host=crawl_per_host,
+            delay_s=crawl_delay,
+        )
 
-    ranked = _rank_urls_for_llms(urls, base_url)
+    ranked = _rank_urls_for_llms(urls, base_url, lastmod)
     selected_urls = ranked[:max_links]
 
     items: list[LinkItem] = []
@@ -1058,13 +2111,13 @@ def _generate_from_sitemap_or_crawl(
     )
     _write_file(out_dir / "llms.txt", llms_txt)
 
-    _build_llms_full_from_urls(items, out_dir / "llms-full.txt")
+    full_stats = _build_llms_full_from_urls(items, out_dir / "llms-full.txt", options=convert)
 
     return {
         "method": method,
         "discovered_urls": len(urls),
         "llms_links": len(items),
-        "full": {"source": "markitdown", "converted_pages": len(items)},
+        "full": {"source": "markitdown", **full_stats},
     }
 
 
@@ -1075,6 +2128,19 @@ def main(argv: list[str]) -> int:
     ap.add_argument("--max-pages", type=int, default=60, help="Max pages to crawl/convert (default: 60)")
     ap.add_argument("--max-depth", type=int, default=3, help="Max crawl depth (default: 3)")
     ap.add_argument("--max-links", type=int, default=30, help="Max links to include in llms.txt (default: 30)")
+    ap.add_argument("--crawl-workers", type=int, default=8, help="Concurrent crawl fetches (default: 8)")
+    ap.add_argument(
+        "--crawl-per-host",
+        type=int,
+        default=4,
+        help="Max concurrent crawl requests per origin (default: 4)",
+    )
+    ap.add_argument(
+        "--crawl-delay",
+        type=float,
+        default=0.0,
+        help="Min seconds between crawl request starts per origin; robots.txt Crawl-delay wins if larger (default: 0)",
+    )
     ap.add_argument(
         "--full-scope",
         choices=["all", "selected"],
@@ -1085,19 +2151,40 @@ def main(argv: list[str]) -> int:
         "--max-full-bytes",
         type=int,
         default=12_000_000,
-        help="Safety cap for repo-based llms-full before falling back to selected (default: 12MB)",
+        help="Safety cap for llms-full: repo runs fall back to selected, page runs stop converting (default: 12MB)",
     )
     ap.add_argument(
         "--force-full",
         action="store_true",
         help="Ignore --max-full-bytes and always include the requested --full-scope",
     )
+    ap.add_argument(
+        "--repo-cache",
+        help="Where bare repo mirrors are kept between runs "
+        "(default: $LLMS_TXT_REPO_CACHE or $XDG_CACHE_HOME/llms-txt-from-website/repos)",
+    )
     ap.add_argument("--no-crawl", action="store_true", help="Do not crawl if repo discovery fails")
     ap.add_argument(
         "--include-source-links",
         action="store_true",
         help="Include an additional absolute source URL (e.g. GitHub blob) next to each link in llms.txt",
     )
+    ap.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="Do not use or update the conditional-request HTTP cache under <out>/<slug>/sources/",
+    )
+    ap.add_argument(
+        "--refresh-changed",
+        action="store_true",
+        help="Reuse previous Markdown conversions for pages whose content hash is unchanged",
+    )
+    ap.add_argument(
+        "--convert-workers",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Pages fetched and converted to Markdown in parallel (default: min(8, CPUs))",
+    )
     ap.add_argument("--json", action="store_true", help="Print metadata JSON to stdout")
     args = ap.parse_args(argv)
 
@@ -1112,8 +2199,19 @@ def main(argv: list[str]) -> int:
         "generator": "llms-txt-from-website",
     }
 
+    global _HTTP_CACHE
+    sources_dir = out_dir / "sources"
+    if not args.no_http_cache:
+        _HTTP_CACHE = _HttpCache(sources_dir / "http-cache")
+    convert = ConvertOptions(
+        md_cache=_MarkdownCache(sources_dir / "markdown"),
+        refresh_changed=args.refresh_changed,
+        workers=args.convert_workers,
+        max_bytes=None if args.force_full else args.max_full_bytes,
+    )
+
     try:
-        existing = _generate_from_existing_llms(base_url, out_dir, max_pages=args.max_pages)
+        existing = _generate_from_existing_llms(base_url, out_dir, max_pages=args.max_pages, convert=convert)
         if existing:
             meta.update(existing)
         else:
@@ -1125,6 +2223,7 @@ def main(argv: list[str]) -> int:
                 max_full_bytes=args.max_full_bytes,
                 force_full=args.force_full,
                 include_source_links=args.include_source_links,
+                repo_cache=Path(args.repo_cache).expanduser() if args.repo_cache else None,
             )
             if repo_meta:
                 meta.update(repo_meta)
@@ -1138,14 +2237,22 @@ def main(argv: list[str]) -> int:
                         max_pages=args.max_pages,
                         max_depth=args.max_depth,
                         max_links=args.max_links,
+                        crawl_workers=args.crawl_workers,
+                        crawl_per_host=args.crawl_per_host,
+                        crawl_delay=args.crawl_delay,
+                        convert=convert,
                     )
                 )
     except GenerateError as exc:
         _eprint(f"error: {exc}")
         meta["error"] = str(exc)
+        if _HTTP_CACHE is not None:
+            meta["http_cache"] = dict(_HTTP_CACHE.stats)
         _write_file(out_dir / "metadata.json", json.dumps(meta, indent=2, sort_keys=True) + "\n")
         return 2
 
+    if _HTTP_CACHE is not None:
+        meta["http_cache"] = dict(_HTTP_CACHE.stats)
     _write_file(out_dir / "metadata.json", json.dumps(meta, indent=2, sort_keys=True) + "\n")
     if args.json:
         print(json.dumps(meta, indent=2, sort_keys=True))
@@ -0,0 +1,472 @@
+import gzip
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+SCRIPT_PATH = Path(__file__).resolve().parents[1] / "scripts" / "generate_llms_files.py"
+
+STUB_MARKITDOWN = textwrap.dedent(
+    """\
+    import os
+    import re
+    from types import SimpleNamespace
+
+
+    class MarkItDown:
+        def convert_stream(self, stream, file_extension=None, url=None):
+            log = os.environ.get("STUB_MARKITDOWN_LOG")
+            if log:
+                with open(log, "a", encoding="utf-8") as f:
+                    f.write(url + "\\n")
+            text = re.sub(r"<[^>]+>", " ", stream.read().decode("utf-8"))
+            return SimpleNamespace(text_content="stub: " + " ".join(text.split()))
+    """
+)
+
+
+def load_module(module_name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class Route:
+    body: bytes
+    content_type: str = "text/html; charset=utf-8"
+    headers: dict[str, str] = field(default_factory=dict)
+    # Status answered to HEAD instead of the GET response (e.g. 405 for servers that reject HEAD).
+    head_status: int | None = None
+    delay_s: float = 0.0
+
+
+class FixtureSite:
+    """Local http.server site: fixed routes, ETag revalidation, a request log, and peak concurrency."""
+
+    def __init__(self) -> None:
+        self.routes: dict[str, Route] = {}
+        self.requests: list[tuple[float, str, str, int]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+                pass
+
+            def _respond(self, send_body: bool) -> None:
+                route = site.routes.get(self.path)
+                etag = route.headers.get("ETag") if route else None
+                if route is not None and route.delay_s:
+                    with site._lock:
+                        site.in_flight += 1
+                        site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                    time.sleep(route.delay_s)
+                    with site._lock:
+                        site.in_flight -= 1
+                if route is None:
+                    status, body, headers = 404, b"not found", {"Content-Type": "text/plain"}
+                elif route.head_status is not None and self.command == "HEAD":
+                    status, body, headers = route.head_status, b"", {}
+                elif etag and self.headers.get("If-None-Match") == etag:
+                    status, body, headers = 304, b"", dict(route.headers)
+                else:
+                    status, body = 200, route.body
+                    headers = {"Content-Type": route.content_type, **route.headers}
+                site.requests.append((time.monotonic(), self.command, self.path, status))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body) if status != 304 else 0))
+                self.end_headers()
+                if send_body and status != 304:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.origin = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def page(self, path: str, title: str, *links: str, headers: dict[str, str] | None = None) -> None:
+        anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+        html = f"<html><head><title>{title}</title></head><body><p>{title} body</p>{anchors}</body></html>"
+        self.routes[path] = Route(html.encode("utf-8"), headers=dict(headers or {}))
+
+    def hits(self, path: str) -> list[tuple[float, str, str, int]]:
+        return [request for request in self.requests if request[2] == path]
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class GenerateLlmsFilesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Loopback requests must never go through a proxy from the environment.
+        os.environ["NO_PROXY"] = os.environ["no_proxy"] = "127.0.0.1,localhost"
+        cls.stub_dir = tempfile.TemporaryDirectory()
+        package = Path(cls.stub_dir.name) / "markitdown"
+        package.mkdir()
+        (package / "__init__.py").write_text(STUB_MARKITDOWN, encoding="utf-8")
+        sys.path.insert(0, cls.stub_dir.name)
+        cls.old_pythonpath = os.environ.get("PYTHONPATH")
+        os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [cls.stub_dir.name, cls.old_pythonpath]))
+        cls.module = load_module("generate_llms_files", SCRIPT_PATH)
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.path.remove(cls.stub_dir.name)
+        if cls.old_pythonpath is None:
+            os.environ.pop("PYTHONPATH", None)
+        else:
+            os.environ["PYTHONPATH"] = cls.old_pythonpath
+        cls.stub_dir.cleanup()
+
+    def setUp(self):
+        self.site = FixtureSite()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self.tmpdir.name)
+        self.convert_log = self.tmp / "markitdown.log"
+        os.environ["STUB_MARKITDOWN_LOG"] = str(self.convert_log)
+        self.module._HTTP_CACHE = None
+
+    def tearDown(self):
+        self.module._HTTP_CACHE = None
+        os.environ.pop("STUB_MARKITDOWN_LOG", None)
+        self.site.close()
+        self.tmpdir.cleanup()
+
+    def url(self, path: str) -> str:
+        return self.site.origin + path
+
+    def conversions(self) -> list[str]:
+        if not self.convert_log.exists():
+            return []
+        return self.convert_log.read_text(encoding="utf-8").split()
+
+    def test_crawl_dedupes_links_and_stops_at_max_depth(self):
+        self.site.page(
+            "/docs/",
+            "Home",
+            "a",
+            "a#intro",
+            "/docs/a?ref=nav",
+            "/docs/a/",
+            "b",
+            "/blog/post",
+            "logo.png",
+            "https://example.com/elsewhere",
+        )
+        self.site.page("/docs/a", "A", "/docs/", "b")
+        self.site.page("/docs/b", "B", "c")
+        self.site.page("/docs/c", "C")
+
+        urls = self.module._crawl_internal(self.url("/docs/"), max_pages=10, max_depth=1, workers=4)
+
+        self.assertEqual(urls, [self.url("/docs/"), self.url("/docs/a"), self.url("/docs/b")])
+        self.assertEqual(len(self.site.hits("/docs/a")), 1)
+        self.assertEqual(self.site.hits("/docs/c"), [])
+        self.assertEqual(self.site.hits("/blog/post"), [])
+
+    def test_crawl_honors_robots_crawl_delay_and_disallow(self):
+        self.site.routes["/robots.txt"] = Route(
+            b"User-agent: *\nCrawl-delay: 1\nDisallow: /docs/private\n", content_type="text/plain"
+        )
+        self.site.page("/docs/", "Home", "a", "b", "private")
+        self.site.page("/docs/a", "A")
+        self.site.page("/docs/b", "B")
+        self.site.page("/docs/private", "Private")
+
+        urls = self.module._crawl_internal(self.url("/docs/"), max_pages=10, max_depth=2, workers=4, per_host=4)
+
+        self.assertEqual(urls, [self.url("/docs/"), self.url("/docs/a"), self.url("/docs/b")])
+        self.assertEqual(self.site.hits("/docs/private"), [])
+        starts = sorted(stamp for stamp, _method, path, _status in self.site.requests if path.startswith("/docs/"))
+        self.assertEqual(len(starts), 3)
+        for earlier, later in zip(starts, starts[1:]):
+            self.assertGreaterEqual(later - earlier, 0.9)
+
+    def serve_sitemaps(self, revalidate: bool = False) -> None:
+        """robots.txt -> sitemap index -> a plain sitemap and a gzipped one."""
+        self.site.routes["/robots.txt"] = Route(
+            f"Sitemap: {self.url('/sitemap_index.xml')}\n".encode("utf-8"), content_type="text/plain"
+        )
+        ns = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+        self.site.routes["/sitemap_index.xml"] = Route(
+            (
+                f"<sitemapindex {ns}>"
+                f"<sitemap><loc>{self.url('/sitemaps/pages.xml')}</loc></sitemap>"
+                f"<sitemap><loc>{self.url('/sitemaps/more.xml.gz')}</loc></sitemap>"
+                "</sitemapindex>"
+            ).encode("utf-8"),
+            content_type="application/xml",
+        )
+        self.site.routes["/sitemaps/pages.xml"] = Route(
+            (
+                f"<urlset {ns}>"
+                f"<url><loc>{self.url('/docs/a')}</loc><lastmod>2024-01-01T08:00:00+00:00</lastmod></url>"
+                f"<url><loc>{self.url('/docs/b')}</loc></url>"
+                f"<url><loc>{self.url('/blog/post')}</loc></url>"
+                "</urlset>"
+            ).encode("utf-8"),
+            content_type="application/xml",
+        )
+        self.site.routes["/sitemaps/more.xml.gz"] = Route(
+            gzip.compress(
+                (
+                    f"<urlset {ns}>"
+                    f"<url><loc>{self.url('/docs/a')}</loc><lastmod>2024-06-01T12:00:00+00:00</lastmod></url>"
+                    f"<url><loc>{self.url('/docs/c')}</loc></url>"
+                    "</urlset>"
+                ).encode("utf-8")
+            ),
+            content_type="application/gzip",
+        )
+        if revalidate:
+            for path in ("/sitemap_index.xml", "/sitemaps/pages.xml", "/sitemaps/more.xml.gz"):
+                self.site.routes[path].headers = {"Cache-Control": "no-cache", "ETag": f'"{path}-1"'}
+
+    def test_sitemap_index_follows_gzip_children_and_keeps_newest_lastmod(self):
+        self.serve_sitemaps()
+
+        base = self.url("/docs/")
+        found = self.module._collect_sitemap_urls(base, accept=self.module._scope_filter(base))
+
+        self.assertEqual(
+            found,
+            {
+                self.url("/docs/a"): datetime(2024, 6, 1, 12, tzinfo=timezone.utc).timestamp(),
+                self.url("/docs/b"): None,
+                self.url("/docs/c"): None,
+            },
+        )
+
+    def test_streamed_sitemaps_are_revalidated_through_the_http_cache(self):
+        self.serve_sitemaps(revalidate=True)
+        self.module._HTTP_CACHE = self.module._HttpCache(self.tmp / "http-cache")
+        base = self.url("/docs/")
+
+        first = self.module._collect_sitemap_urls(base, accept=self.module._scope_filter(base))
+        self.site.requests.clear()
+        second = self.module._collect_sitemap_urls(base, accept=self.module._scope_filter(base))
+
+        self.assertEqual(second, first)
+        self.assertEqual(len(second), 3)
+        sitemap_statuses = [
+            status for _stamp, _method, path, status in self.site.requests if "sitemap" in path and status != 404
+        ]
+        self.assertEqual(sitemap_statuses, [304, 304, 304])
+        self.assertEqual(self.module._HTTP_CACHE.stats["not_modified"], 3)
+
+        # A changed sitemap is downloaded again and replaces the cached copy.
+        self.site.routes["/sitemaps/pages.xml"].body = self.site.routes["/sitemaps/pages.xml"].body.replace(
+            b"/docs/b", b"/docs/d"
+        )
+        self.site.routes["/sitemaps/pages.xml"].headers["ETag"] = '"pages-2"'
+        third = self.module._collect_sitemap_urls(base, accept=self.module._scope_filter(base))
+        self.assertIn(self.url("/docs/d"), third)
+        self.assertNotIn(self.url("/docs/b"), third)
+        self.assertEqual(self.module._collect_sitemap_urls(base, accept=self.module._scope_filter(base)), third)
+
+    def test_date_only_lastmod_from_the_fetch_day_still_revalidates(self):
+        self.site.page("/docs/a", "A", headers={"Cache-Control": "no-cache", "ETag": '"a-1"'})
+        url = self.url("/docs/a")
+        cache = self.module._HttpCache(self.tmp / "http-cache")
+        cache.fetch(url, timeout_s=5, max_bytes=1_000_000)
+
+        today = datetime.now(timezone.utc).date()
+        cache.lastmod[url] = self.module._parse_lastmod(today.isoformat())
+        cache.fetch(url, timeout_s=5, max_bytes=1_000_000)
+        self.assertEqual(cache.stats, {"fresh_hits": 0, "not_modified": 1, "downloads": 1})
+
+        cache.lastmod[url] = self.module._parse_lastmod("2001-02-03")
+        cache.fetch(url, timeout_s=5, max_bytes=1_000_000)
+        self.assertEqual(cache.stats["fresh_hits"], 1)
+        self.assertEqual(
+            self.module._parse_lastmod("2001-02-03"), datetime(2001, 2, 4, tzinfo=timezone.utc).timestamp()
+        )
+        self.assertEqual(
+            self.module._parse_lastmod("2001-02-03T10:00:00"), datetime(2001, 2, 3, 10, tzinfo=timezone.utc).timestamp()
+        )
+
+    def test_missing_markdown_variant_is_not_probed_again_for_unchanged_pages(self):
+        self.site.page("/docs/guide", "Guide", headers={"Cache-Control": "no-cache", "ETag": '"guide-1"'})
+        self.module._HTTP_CACHE = self.module._HttpCache(self.tmp / "http-cache")
+        md_cache = self.module._MarkdownCache(self.tmp / "markdown")
+        workers = self.module._MarkitdownWorkers()
+        self.addCleanup(workers.close)
+
+        def convert() -> str:
+            md, _reused = self.module._convert_url_to_markdown(
+                self.url("/docs/guide"), workers=workers, md_cache=md_cache, reuse_cached=True
+            )
+            return md
+
+        self.assertEqual(convert(), "stub: Guide Guide body")
+        self.assertEqual([status for *_rest, status in self.site.hits("/docs/guide.md")], [404])
+        self.assertEqual(convert(), "stub: Guide Guide body")
+        self.assertEqual(len(self.site.hits("/docs/guide.md")), 1)
+        self.assertEqual([status for *_rest, status in self.site.hits("/docs/guide")], [200, 304])
+
+        # Changed page bytes mean the site may have published a variant since.
+        self.site.page("/docs/guide", "Guide v2", headers={"Cache-Control": "no-cache", "ETag": '"guide-2"'})
+        self.site.routes["/docs/guide.md"] = Route(b"# Guide\n", content_type="text/markdown")
+        self.assertEqual(convert(), "# Guide\n")
+        self.assertEqual([status for *_rest, status in self.site.hits("/docs/guide.md")], [404, 200])
+
+    def test_link_check_falls_back_to_get_caps_each_host_and_reuses_results(self):
+        paths = [f"/docs/p{i}" for i in range(6)]
+        for path in paths:
+            self.site.routes[path] = Route(b"ok", delay_s=0.2)
+        self.site.routes["/docs/no-head"] = Route(b"ok", head_status=405)
+        urls = [self.url(path) for path in [*paths, "/docs/no-head", "/docs/missing"]]
+        cache_path = self.tmp / "link-check.json"
+
+        def check(**kwargs) -> dict[str, bool]:
+            return self.module._urls_exist(urls, workers=8, per_host=2, cache_path=cache_path, **kwargs)
+
+        expected = {**{u: True for u in urls[:-1]}, self.url("/docs/missing"): False}
+        self.assertEqual(check(), expected)
+        self.assertEqual(self.site.max_in_flight, 2)
+        self.assertEqual(
+            [(method, status) for _stamp, method, _path, status in self.site.hits("/docs/no-head")],
+            [("HEAD", 405), ("GET", 200)],
+        )
+        self.assertEqual([method for _stamp, method, _path, _status in self.site.hits("/docs/missing")], ["HEAD"])
+        self.assertEqual(set(json.loads(cache_path.read_text(encoding="utf-8"))), set(urls))
+
+        self.site.requests.clear()
+        self.assertEqual(check(), expected)
+        self.assertEqual(self.site.requests, [])
+
+        self.assertEqual(check(ttl_s=0), expected)
+        self.assertEqual(len(self.site.requests), len(urls) + 1)
+
+    def test_llms_full_manifest_offsets_address_each_section(self):
+        items = []
+        for name in ("alpha", "beta", "gamma"):
+            self.site.page(f"/docs/{name}", name.title())
+            items.append(self.module.LinkItem(title=name.title(), url=self.url(f"/docs/{name}"), category="Docs"))
+        out_path = self.tmp / "llms-full.txt"
+
+        stats = self.module._build_llms_full_from_urls(
+            items, out_path, options=self.module.ConvertOptions(workers=3)
+        )
+
+        data = out_path.read_bytes()
+        manifest = json.loads((self.tmp / "llms-full.manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual(stats["sections"], 3)
+        self.assertEqual(manifest["bytes"], len(data))
+        self.assertEqual([section["title"] for section in manifest["sections"]], ["Alpha", "Beta", "Gamma"])
+        for section, item in zip(manifest["sections"], items):
+            chunk = data[section["offset"] : section["offset"] + section["length"]].decode("utf-8")
+            self.assertTrue(chunk.startswith(f"# {item.title}\n\nSource: {item.url}\n\nstub: {item.title}"))
+            self.assertTrue(chunk.endswith("\n"))
+
+        budget = manifest["sections"][0]["length"] + 10
+        stats = self.module._build_llms_full_from_urls(
+            items, out_path, options=self.module.ConvertOptions(workers=3, max_bytes=budget)
+        )
+        self.assertEqual((stats["sections"], stats["budget_reached"]), (1, True))
+        self.assertLessEqual(out_path.stat().st_size, budget)
+
+    def test_failed_mirror_setup_leaves_no_temporary_directory(self):
+        cache_root = self.tmp / "repos"
+        source = self.tmp / "upstream" / "docs"
+        self.module._run(["git", "init", "--bare", "--quiet", f"{source}.git"], capture=True)
+        repo = self.module.RepoRef(owner="acme", repo="docs", url=str(source))
+        real_run = self.module._run
+
+        def fail_config(cmd, **kwargs):
+            if "config" in cmd:
+                raise self.module.GenerateError("config failed")
+            return real_run(cmd, **kwargs)
+
+        with mock.patch.object(self.module, "_run", side_effect=fail_config):
+            with self.assertRaises(self.module.GenerateError):
+                self.module._sync_mirror(repo, cache_root)
+
+        self.assertEqual(list((cache_root / "acme").iterdir()), [])
+
+    def run_main(self, *extra: str) -> dict:
+        code = self.module.main(
+            ["--url", self.url("/docs/"), "--out", str(self.tmp / "out"), "--convert-workers", "2", *extra]
+        )
+        self.assertEqual(code, 0)
+        (metadata,) = (self.tmp / "out").glob("*/metadata.json")
+        return json.loads(metadata.read_text(encoding="utf-8"))
+
+    def test_rerun_revalidates_with_304_and_reuses_conversions(self):
+        revalidate = {"Cache-Control": "no-cache"}
+        self.site.page("/docs/", "Home", "guide", "api", headers={**revalidate, "ETag": '"home-1"'})
+        self.site.page("/docs/guide", "Guide", headers={**revalidate, "ETag": '"guide-1"'})
+        self.site.page("/docs/api", "Api", headers={**revalidate, "ETag": '"api-1"'})
+
+        first = self.run_main()
+        self.assertEqual(first["method"], "crawl")
+        self.assertEqual(first["full"]["converted_pages"], 3)
+        self.assertEqual(len(self.conversions()), 3)
+        (full_path,) = (self.tmp / "out").glob("*/llms-full.txt")
+        first_full = full_path.read_bytes()
+
+        self.site.requests.clear()
+        second = self.run_main("--refresh-changed")
+
+        self.assertEqual(second["full"]["reused_pages"], 3)
+        self.assertEqual(second["full"]["converted_pages"], 0)
+        self.assertEqual(len(self.conversions()), 3)
+        self.assertGreaterEqual(second["http_cache"]["not_modified"], 3)
+        self.assertTrue(
+            all(status == 304 for _stamp, method, path, status in self.site.requests if path in ("/docs/guide", "/docs/api"))
+        )
+        self.assertEqual(full_path.read_bytes(), first_full)
+
+    def test_downloaded_llms_full_replaces_a_crawl_manifest(self):
+        self.site.page("/docs/", "Home", "guide")
+        self.site.page("/docs/guide", "Guide")
+        self.run_main()
+        (manifest_path,) = (self.tmp / "out").glob("*/llms-full.manifest.json")
+        self.assertEqual(len(json.loads(manifest_path.read_text(encoding="utf-8"))["sections"]), 2)
+
+        published = b"# Published\n\nThe site's own full text.\n"
+        self.site.routes["/docs/llms.txt"] = Route(b"# Docs\n\n- [Guide](/docs/guide)\n", content_type="text/plain")
+        self.site.routes["/docs/llms-full.txt"] = Route(published, content_type="text/plain")
+        metadata = self.run_main()
+
+        self.assertEqual(metadata["method"], "existing_llms")
+        self.assertEqual(manifest_path.with_name("llms-full.txt").read_bytes(), published)
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        self.assertEqual(manifest["bytes"], len(published))
+        self.assertEqual(
+            manifest["sections"],
+            [{"title": "llms-full.txt", "source": self.url("/docs/llms-full.txt"), "offset": 0, "length": len(published)}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Find byte-identical files with size buckets and staged, memory-mapped hashing."""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+
+from document_scan import FileRecord, TreeScan
+
+EDGE_BYTES = 64 * 1024
+HASH_ALGORITHM = "blake2b"
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _digest(path: Path, size_bytes: int, edges_only: bool) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            # hashlib releases the GIL for large buffers, so pool threads overlap I/O and hashing.
+            if edges_only and size_bytes > 2 * EDGE_BYTES:
+                digest.update(view[:EDGE_BYTES])
+                digest.update(view[-EDGE_BYTES:])
+            else:
+                digest.update(view)
+        finally:
+            view.release()
+    return digest.hexdigest()
+
+
+def edge_hash(path: Path, size_bytes: int) -> str:
+    """Hash the first and last 64 KiB; this is the full content hash for files up to 128 KiB."""
+    return _digest(path, size_bytes, edges_only=True)
+
+
+def full_hash(path: Path, size_bytes: int) -> str:
+    return _digest(path, size_bytes, edges_only=False)
+
+
+def _hash_groups(
+    scan: TreeScan,
+    groups: Iterable[list[FileRecord]],
+    hasher: Callable[[Path, int], str],
+    pool: ThreadPoolExecutor,
+    stats: dict[str, int],
+) -> list[list[FileRecord]]:
+    """Split each group by `hasher`, keeping only sub-groups that still collide."""
+    groups = list(groups)
+    records = [record for group in groups for record in group]
+
+    def run(record: FileRecord) -> str | None:
+        try:
+            return hasher(scan.root / record.path, record.size_bytes)
+        except (OSError, ValueError):
+            return None
+
+    digests = dict(zip((id(record) for record in records), pool.map(run, records)))
+    collisions: list[list[FileRecord]] = []
+    for group in groups:
+        by_digest: dict[str, list[FileRecord]] = defaultdict(list)
+        for record in group:
+            digest = digests[id(record)]
+            if digest is None:
+                stats["unreadable_files"] += 1
+                continue
+            by_digest[digest].append(record)
+        collisions.extend(members for members in by_digest.values() if len(members) > 1)
+    return collisions
+
+
+def content_duplicates_from_scan(
+    scan: TreeScan,
+    min_size_bytes: int = 1,
+    workers: int = DEFAULT_WORKERS,
+) -> dict[str, object]:
+    """Group files with identical bytes.
+
+    Symlinks are skipped and hard links to one inode count once, since
+    deleting either frees no space. Stage 1 buckets by size, which is free
+    from the scan. Stage 2 hashes only the first and last 64 KiB of files that
+    share a size. Stage 3 reads in full only the large files whose edges still
+    collide, so unique files are almost never read end to end.
+    """
+    stats = {
+        "files_considered": 0,
+        "skipped_symlinks": 0,
+        "skipped_hard_links": 0,
+        "edge_hashed_files": 0,
+        "full_hashed_files": 0,
+        "unreadable_files": 0,
+    }
+    by_size: dict[int, list[FileRecord]] = defaultdict(list)
+    inodes: set[tuple[int, int]] = set()
+    for record in scan.files:
+        if record.size_bytes < max(min_size_bytes, 1):
+            continue
+        if record.symlink:
+            stats["skipped_symlinks"] += 1
+            continue
+        if record.inode:
+            if (record.device, record.inode) in inodes:
+                stats["skipped_hard_links"] += 1
+                continue
+            inodes.add((record.device, record.inode))
+        stats["files_considered"] += 1
+        by_size[record.size_bytes].append(record)
+    size_groups = [group for group in by_size.values() if len(group) > 1]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        stats["edge_hashed_files"] = sum(len(group) for group in size_groups)
+        edge_groups = _hash_groups(scan, size_groups, edge_hash, pool, stats)
+        settled = [group for group in edge_groups if group[0].size_bytes <= 2 * EDGE_BYTES]
+        large = [group for group in edge_groups if group[0].size_bytes > 2 * EDGE_BYTES]
+        stats["full_hashed_files"] = sum(len(group) for group in large)
+        confirmed = settled + _hash_groups(scan, large, full_hash, pool, stats)
+
+    duplicate_groups = []
+    for group in confirmed:
+        size_bytes = group[0].size_bytes
+        duplicate_groups.append(
+            {
+                "size_bytes": size_bytes,
+                "occurrences": sorted(record.path for record in group),
+                "redundant_bytes": size_bytes * (len(group) - 1),
+            }
+        )
+    duplicate_groups.sort(key=lambda item: (-item["redundant_bytes"], item["occurrences"][0]))
+
+    return {
+        "root": str(scan.root),
+        "include_hidden": scan.include_hidden,
+        "min_size_bytes": min_size_bytes,
+        "hash_algorithm": HASH_ALGORITHM,
+        "redundant_bytes": sum(group["redundant_bytes"] for group in duplicate_groups),
+        "duplicate_groups": duplicate_groups,
+        "stats": stats,
+    }
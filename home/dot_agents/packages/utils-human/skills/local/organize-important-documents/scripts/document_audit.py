@@ -0,0 +1,111 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.14"
+# dependencies = []
+# ///
+"""Run the inventory, extension, and duplicate reports from one tree walk."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from content_hashes import DEFAULT_WORKERS, content_duplicates_from_scan  # noqa: E402
+from document_scan import TreeScan, scan_tree  # noqa: E402
+from duplicate_name_report import duplicate_names_from_scan  # noqa: E402
+from extension_summary import extension_summary_from_scan  # noqa: E402
+from inventory_snapshot import add_snapshot_arguments, scan_with_snapshots  # noqa: E402
+from inventory_tree import inventory_payload  # noqa: E402
+
+
+def document_audit(
+    root: Path,
+    max_depth: int = 2,
+    include_hidden: bool = False,
+    min_occurrences: int = 2,
+    content_duplicates: bool = False,
+    workers: int = DEFAULT_WORKERS,
+) -> dict[str, object]:
+    return audit_from_scan(
+        scan_tree(root, include_hidden=include_hidden),
+        max_depth=max_depth,
+        min_occurrences=min_occurrences,
+        content_duplicates=content_duplicates,
+        workers=workers,
+    )
+
+
+def audit_from_scan(
+    scan: TreeScan,
+    max_depth: int = 2,
+    min_occurrences: int = 2,
+    content_duplicates: bool = False,
+    workers: int = DEFAULT_WORKERS,
+) -> dict[str, object]:
+    payload = {
+        "root": str(scan.root),
+        "include_hidden": scan.include_hidden,
+        "inventory": inventory_payload(scan, max_depth=max_depth),
+        "extensions": extension_summary_from_scan(scan),
+        "duplicate_names": duplicate_names_from_scan(scan, min_occurrences=min_occurrences),
+    }
+    if content_duplicates:
+        payload["duplicate_content"] = content_duplicates_from_scan(scan, workers=workers)
+    return payload
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root", help="Root directory to audit")
+    parser.add_argument("--max-depth", type=int, default=2, help="Maximum directory depth in the inventory")
+    parser.add_argument("--include-hidden", action="store_true", help="Include hidden files and folders")
+    parser.add_argument("--min-occurrences", type=int, default=2, help="Minimum duplicate count to report")
+    parser.add_argument(
+        "--content-duplicates",
+        action="store_true",
+        help="Also hash same-size files to report byte-identical duplicates",
+    )
+    add_snapshot_arguments(parser)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Hashing threads for --content-duplicates and --hash-contents",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        scan, changes = scan_with_snapshots(
+            Path(args.root),
+            include_hidden=args.include_hidden,
+            since=args.since,
+            snapshot=args.snapshot,
+            hash_contents=args.hash_contents,
+            workers=args.workers,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    payload = audit_from_scan(
+        scan,
+        max_depth=args.max_depth,
+        min_occurrences=args.min_occurrences,
+        content_duplicates=args.content_duplicates,
+        workers=args.workers,
+    )
+    if changes is not None:
+        payload["changes"] = changes
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+"""Walk a document tree once and keep what every audit report needs."""
+
+from __future__ import annotations
+
+import os
+import stat
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class FileRecord:
+    path: str
+    name: str
+    size_bytes: int
+    mtime_ns: int = 0
+    inode: int = 0
+    content_hash: str | None = None
+    device: int = 0
+    symlink: bool = False
+
+
+@dataclass
+class DirectoryRecord:
+    path: str
+    depth: int
+    parent: int | None
+    direct_file_count: int = 0
+    child_dir_count: int = 0
+    total_file_count: int = 0
+    total_size_bytes: int = 0
+    mtime_ns: int = 0
+
+
+@dataclass
+class DirectoryListing:
+    """What a previous scan saw directly inside one directory.
+
+    `stable` is False when the directory changed too close to that scan for
+    an unchanged mtime to prove its entries are unchanged.
+    """
+
+    mtime_ns: int
+    stable: bool
+    child_dir_count: int
+    subdirs: list[str] = field(default_factory=list)
+    files: list[FileRecord] = field(default_factory=list)
+
+
+@dataclass
+class TreeScan:
+    root: Path
+    include_hidden: bool
+    files: list[FileRecord] = field(default_factory=list)
+    directories: list[DirectoryRecord] = field(default_factory=list)
+    started_at_ns: int = 0
+    scanned_directories: int = 0
+    reused_directories: int = 0
+
+
+def is_hidden(name: str) -> bool:
+    return name.startswith(".")
+
+
+def _child_path(relative: str, name: str) -> str:
+    return f"{relative}{os.sep}{name}" if relative else name
+
+
+def _reuse_listing(
+    scan: TreeScan,
+    index: int,
+    absolute: str,
+    relative: str,
+    listing: DirectoryListing,
+    pending: list[tuple[int, str, str]],
+) -> None:
+    directory = scan.directories[index]
+    directory.child_dir_count = listing.child_dir_count
+    for record in listing.files:
+        directory.direct_file_count += 1
+        directory.total_file_count += 1
+        directory.total_size_bytes += record.size_bytes
+        scan.files.append(FileRecord(**vars(record)))
+    for name in listing.subdirs:
+        child_absolute = os.path.join(absolute, name)
+        try:
+            info = os.stat(child_absolute, follow_symlinks=False)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        if not stat.S_ISDIR(info.st_mode):
+            continue
+        child_index = len(scan.directories)
+        child_relative = _child_path(relative, name)
+        scan.directories.append(
+            DirectoryRecord(path=child_relative, depth=directory.depth + 1, parent=index, mtime_ns=info.st_mtime_ns)
+        )
+        pending.append((child_index, child_absolute, child_relative))
+
+
+def scan_tree(
+    root: Path,
+    include_hidden: bool = False,
+    previous: Mapping[str, DirectoryListing] | None = None,
+) -> TreeScan:
+    """Scan `root` with `os.scandir`, pruning hidden entries as they are seen.
+
+    Each file is stat'ed once through its cached `DirEntry`. Directories are
+    recorded parent-first, so per-directory totals come from one reverse pass
+    that adds every directory into its parent.
+
+    With `previous` listings, a stable directory whose mtime is unchanged is
+    not listed again: its files and subdirectory names come from the listing,
+    and only its subdirectories are stat'ed to decide whether they changed.
+    Files in rescanned directories keep their previous `content_hash` when
+    size, mtime, and inode all match. Symlinked files are recorded with their
+    target's stat and `symlink=True`.
+    """
+    root = root.resolve()
+    scan = TreeScan(root=root, include_hidden=include_hidden, started_at_ns=time.time_ns())
+    try:
+        root_mtime_ns = os.stat(root).st_mtime_ns
+    except OSError:
+        root_mtime_ns = 0
+    scan.directories.append(DirectoryRecord(path=".", depth=0, parent=None, mtime_ns=root_mtime_ns))
+    pending = [(0, str(root), "")]
+    while pending:
+        index, absolute, relative = pending.pop()
+        directory = scan.directories[index]
+        listing = previous.get(directory.path) if previous is not None else None
+        if listing is not None and listing.stable and listing.mtime_ns == directory.mtime_ns:
+            scan.reused_directories += 1
+            _reuse_listing(scan, index, absolute, relative, listing, pending)
+            continue
+        try:
+            with os.scandir(absolute) as entries:
+                children = sorted(entries, key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        scan.scanned_directories += 1
+        known = {record.name: record for record in listing.files} if listing is not None else {}
+        for entry in children:
+            if not include_hidden and is_hidden(entry.name):
+                continue
+            child_relative = _child_path(relative, entry.name)
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    mtime_ns = entry.stat(follow_symlinks=False).st_mtime_ns
+                    directory.child_dir_count += 1
+                    child_index = len(scan.directories)
+                    scan.directories.append(
+                        DirectoryRecord(path=child_relative, depth=directory.depth + 1, parent=index, mtime_ns=mtime_ns)
+                    )
+                    pending.append((child_index, entry.path, child_relative))
+                elif entry.is_file():
+                    info = entry.stat()
+                    directory.direct_file_count += 1
+                    directory.total_file_count += 1
+                    directory.total_size_bytes += info.st_size
+                    record = FileRecord(
+                        path=child_relative,
+                        name=entry.name,
+                        size_bytes=info.st_size,
+                        mtime_ns=info.st_mtime_ns,
+                        inode=info.st_ino,
+                        device=info.st_dev,
+                        symlink=entry.is_symlink(),
+                    )
+                    before = known.get(entry.name)
+                    if before is not None and (before.size_bytes, before.mtime_ns, before.inode) == (
+                        record.size_bytes,
+                        record.mtime_ns,
+                        record.inode,
+                    ):
+                        record.content_hash = before.content_hash
+                    scan.files.append(record)
+                elif entry.is_dir():
+                    # Symlinked directories count as children but are not followed.
+                    directory.child_dir_count += 1
+            except (FileNotFoundError, PermissionError):
+                continue
+
+    for directory in reversed(scan.directories):
+        if directory.parent is not None:
+            parent = scan.directories[directory.parent]
+            parent.total_file_count += directory.total_file_count
+            parent.total_size_bytes += directory.total_size_bytes
+    return scan
@@ -3,41 +3,31 @@
 # requires-python = ">=3.14"
 # dependencies = []
 # ///
-"""Report duplicate basenames in a document tree."""
+"""Report duplicate basenames, or byte-identical files with `--mode content`, in a document tree."""
 
 from __future__ import annotations
 
 import argparse
 import json
+import sys
 from collections import defaultdict
 from pathlib import Path
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
 
-def include_path(path: Path, include_hidden: bool) -> bool:
-    if include_hidden:
-        return True
-    return not any(part.startswith(".") for part in path.parts)
+from content_hashes import DEFAULT_WORKERS, content_duplicates_from_scan  # noqa: E402
+from document_scan import TreeScan, scan_tree  # noqa: E402
 
 
-def duplicate_name_report(
-    root: Path,
-    include_hidden: bool = False,
-    min_occurrences: int = 2,
-) -> dict[str, object]:
+def duplicate_names_from_scan(scan: TreeScan, min_occurrences: int = 2) -> dict[str, object]:
     groups: dict[str, list[dict[str, object]]] = defaultdict(list)
-
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        relative = path.relative_to(root)
-        if not include_path(relative, include_hidden):
-            continue
-        key = path.name.lower()
-        groups[key].append(
+    for record in scan.files:
+        groups[record.name.lower()].append(
             {
-                "name": path.name,
-                "path": str(relative),
-                "size_bytes": path.stat().st_size,
+                "name": record.name,
+                "path": record.path,
+                "size_bytes": record.size_bytes,
             }
         )
 
@@ -49,23 +39,44 @@ def duplicate_name_report(
     duplicates.sort(key=lambda item: (-len(item["occurrences"]), item["basename"].lower()))
 
     return {
-        "root": str(root.resolve()),
-        "include_hidden": include_hidden,
+        "root": str(scan.root),
+        "include_hidden": scan.include_hidden,
         "min_occurrences": min_occurrences,
         "duplicate_groups": duplicates,
     }
 
 
+def duplicate_name_report(
+    root: Path,
+    include_hidden: bool = False,
+    min_occurrences: int = 2,
+) -> dict[str, object]:
+    return duplicate_names_from_scan(scan_tree(root, include_hidden=include_hidden), min_occurrences=min_occurrences)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("root", help="Root directory to analyze")
     parser.add_argument("--include-hidden", action="store_true", help="Include hidden files and folders")
     parser.add_argument("--min-occurrences", type=int, default=2, help="Minimum duplicate count to report")
+    parser.add_argument(
+        "--mode",
+        choices=("name", "content"),
+        default="name",
+        help="Group by lowercase basename, or by identical file content",
+    )
+    parser.add_argument("--min-size", type=int, default=1, help="Smallest file size in bytes for content mode")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Hashing threads for content mode")
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
+    if args.mode == "content":
+        scan = scan_tree(Path(args.root), include_hidden=args.include_hidden)
+        payload = content_duplicates_from_scan(scan, min_size_bytes=args.min_size, workers=args.workers)
+        print(json.dumps(payload, indent=2))
+        return 0
     payload = duplicate_name_report(
         Path(args.root),
         include_hidden=args.include_hidden,
@@ -9,42 +9,36 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from collections import Counter
 from pathlib import Path
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
 
-def include_path(path: Path, include_hidden: bool) -> bool:
-    if include_hidden:
-        return True
-    return not any(part.startswith(".") for part in path.parts)
+from document_scan import TreeScan, scan_tree  # noqa: E402
 
 
-def summarize_extensions(root: Path, include_hidden: bool = False) -> dict[str, object]:
-    counter: Counter[str] = Counter()
-    total_files = 0
-
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        relative = path.relative_to(root)
-        if not include_path(relative, include_hidden):
-            continue
-        total_files += 1
-        suffix = path.suffix.lower().lstrip(".") or "[no_ext]"
-        counter[suffix] += 1
-
+def extension_summary_from_scan(scan: TreeScan) -> dict[str, object]:
+    counter: Counter[str] = Counter(
+        Path(record.name).suffix.lower().lstrip(".") or "[no_ext]" for record in scan.files
+    )
     extensions = [
         {"extension": extension, "count": count}
         for extension, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))
     ]
     return {
-        "root": str(root.resolve()),
-        "include_hidden": include_hidden,
-        "total_files": total_files,
+        "root": str(scan.root),
+        "include_hidden": scan.include_hidden,
+        "total_files": len(scan.files),
         "extensions": extensions,
     }
 
 
+def summarize_extensions(root: Path, include_hidden: bool = False) -> dict[str, object]:
+    return extension_summary_from_scan(scan_tree(root, include_hidden=include_hidden))
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("root", help="Root directory to analyze")
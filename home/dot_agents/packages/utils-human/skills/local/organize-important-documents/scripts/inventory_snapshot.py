@@ -0,0 +1,214 @@
+"""Persist tree scans as snapshots and report what changed since one."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from content_hashes import DEFAULT_WORKERS, HASH_ALGORITHM, full_hash
+from document_scan import DirectoryListing, FileRecord, TreeScan, scan_tree
+
+SNAPSHOT_VERSION = 1
+# Same idea as git's racy-index check: a directory modified within this window
+# of the previous scan may have changed again without its mtime moving.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass
+class Snapshot:
+    root: str
+    include_hidden: bool
+    created_at_ns: int
+    directories: list[dict[str, object]] = field(default_factory=list)
+    files: list[FileRecord] = field(default_factory=list)
+
+
+def load_snapshot(path: Path) -> Snapshot:
+    payload = json.loads(path.read_text())
+    if payload.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} inventory snapshot")
+    return Snapshot(
+        root=payload["root"],
+        include_hidden=payload["include_hidden"],
+        created_at_ns=payload["created_at_ns"],
+        directories=payload["directories"],
+        files=[
+            FileRecord(
+                path=item["path"],
+                name=os.path.basename(item["path"]),
+                size_bytes=item["size_bytes"],
+                mtime_ns=item["mtime_ns"],
+                inode=item["inode"],
+                content_hash=item.get("content_hash"),
+                device=item.get("device", 0),
+                symlink=item.get("symlink", False),
+            )
+            for item in payload["files"]
+        ],
+    )
+
+
+def save_snapshot(path: Path, scan: TreeScan) -> None:
+    """Write `scan` as a snapshot, replacing `path` atomically."""
+    hashed = any(record.content_hash for record in scan.files)
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "root": str(scan.root),
+        "include_hidden": scan.include_hidden,
+        "created_at_ns": scan.started_at_ns,
+        "hash_algorithm": HASH_ALGORITHM if hashed else None,
+        "directories": [
+            {"path": directory.path, "mtime_ns": directory.mtime_ns, "child_dir_count": directory.child_dir_count}
+            for directory in scan.directories
+        ],
+        "files": [
+            {
+                "path": record.path,
+                "size_bytes": record.size_bytes,
+                "mtime_ns": record.mtime_ns,
+                "inode": record.inode,
+                "device": record.device,
+                **({"symlink": True} if record.symlink else {}),
+                **({"content_hash": record.content_hash} if record.content_hash else {}),
+            }
+            for record in scan.files
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.partial")
+    partial.write_text(json.dumps(payload, separators=(",", ":")))
+    partial.replace(path)
+
+
+def snapshot_listings(snapshot: Snapshot) -> dict[str, DirectoryListing]:
+    """Index a snapshot by directory so `scan_tree` can reuse unchanged ones."""
+    listings: dict[str, DirectoryListing] = {}
+    for directory in snapshot.directories:
+        mtime_ns = int(directory["mtime_ns"])
+        listings[str(directory["path"])] = DirectoryListing(
+            mtime_ns=mtime_ns,
+            stable=mtime_ns < snapshot.created_at_ns - RACY_WINDOW_NS,
+            child_dir_count=int(directory["child_dir_count"]),
+        )
+    for directory in snapshot.directories:
+        path = str(directory["path"])
+        if path != ".":
+            parent = listings.get(os.path.dirname(path) or ".")
+            if parent is not None:
+                parent.subdirs.append(os.path.basename(path))
+    for record in snapshot.files:
+        parent = listings.get(os.path.dirname(record.path) or ".")
+        if parent is not None:
+            parent.files.append(record)
+    for listing in listings.values():
+        listing.subdirs.sort()
+    return listings
+
+
+def hash_missing_contents(scan: TreeScan, workers: int = DEFAULT_WORKERS) -> int:
+    """Fill `content_hash` for files without one; carried-over hashes are kept."""
+    missing = [record for record in scan.files if record.content_hash is None and record.size_bytes > 0]
+
+    def run(record: FileRecord) -> str | None:
+        try:
+            return full_hash(scan.root / record.path, record.size_bytes)
+        except (OSError, ValueError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for record, digest in zip(missing, pool.map(run, missing)):
+            record.content_hash = digest
+    return len(missing)
+
+
+def diff_snapshot(previous: Snapshot, scan: TreeScan) -> dict[str, object]:
+    """Compare a snapshot with a newer scan of the same root.
+
+    A path that disappeared and one that appeared are reported as a move when
+    they share an inode and size, or failing that a content hash, instead of
+    as a removal plus an addition.
+    """
+    before = {record.path: record for record in previous.files}
+    after = {record.path: record for record in scan.files}
+    removed = {path: before[path] for path in before.keys() - after.keys()}
+    added = {path: after[path] for path in after.keys() - before.keys()}
+
+    by_inode = {(record.inode, record.size_bytes): path for path, record in removed.items() if record.inode}
+    by_hash: dict[str, list[str]] = defaultdict(list)
+    for path in sorted(removed):
+        if removed[path].content_hash:
+            by_hash[removed[path].content_hash].append(path)
+
+    moved = []
+    for path in sorted(added):
+        record = added[path]
+        source = by_inode.get((record.inode, record.size_bytes)) if record.inode else None
+        matched_by = "inode"
+        if source not in removed and record.content_hash:
+            source = next((item for item in by_hash.get(record.content_hash, ()) if item in removed), None)
+            matched_by = "content_hash"
+        if source not in removed:
+            continue
+        del removed[source]
+        del added[path]
+        moved.append({"from": source, "to": path, "size_bytes": record.size_bytes, "matched_by": matched_by})
+
+    resized = [
+        {"path": path, "old_size_bytes": before[path].size_bytes, "new_size_bytes": after[path].size_bytes}
+        for path in sorted(before.keys() & after.keys())
+        if before[path].size_bytes != after[path].size_bytes
+    ]
+    return {
+        "previous_created_at_ns": previous.created_at_ns,
+        "scanned_directories": scan.scanned_directories,
+        "reused_directories": scan.reused_directories,
+        "counts": {"added": len(added), "removed": len(removed), "moved": len(moved), "resized": len(resized)},
+        "added": [{"path": path, "size_bytes": added[path].size_bytes} for path in sorted(added)],
+        "removed": [{"path": path, "size_bytes": removed[path].size_bytes} for path in sorted(removed)],
+        "moved": moved,
+        "resized": resized,
+    }
+
+
+def add_snapshot_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--since", type=Path, help="Snapshot to diff against; unchanged directories are not re-listed")
+    parser.add_argument("--snapshot", type=Path, help="Write a snapshot of this scan to the given path")
+    parser.add_argument(
+        "--hash-contents",
+        action="store_true",
+        help="Store content hashes in the snapshot so moves are matched across inodes",
+    )
+
+
+def scan_with_snapshots(
+    root: Path,
+    include_hidden: bool = False,
+    since: Path | None = None,
+    snapshot: Path | None = None,
+    hash_contents: bool = False,
+    workers: int = DEFAULT_WORKERS,
+) -> tuple[TreeScan, dict[str, object] | None]:
+    """Scan `root`, reusing and diffing against `since`, then optionally save `snapshot`."""
+    previous = load_snapshot(since) if since is not None else None
+    if previous is not None:
+        resolved = str(root.resolve())
+        if previous.root != resolved or previous.include_hidden != include_hidden:
+            raise ValueError(
+                f"{since} was taken of {previous.root} (include_hidden={previous.include_hidden}), "
+                f"not {resolved} (include_hidden={include_hidden})"
+            )
+    scan = scan_tree(
+        root,
+        include_hidden=include_hidden,
+        previous=snapshot_listings(previous) if previous is not None else None,
+    )
+    if hash_contents:
+        hash_missing_contents(scan, workers=workers)
+    if snapshot is not None:
+        save_snapshot(snapshot, scan)
+    return scan, diff_snapshot(previous, scan) if previous is not None else None
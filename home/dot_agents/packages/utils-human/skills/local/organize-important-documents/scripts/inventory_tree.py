@@ -9,9 +9,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Iterable
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from content_hashes import DEFAULT_WORKERS  # noqa: E402
+from document_scan import TreeScan, scan_tree  # noqa: E402
+from inventory_snapshot import add_snapshot_arguments, scan_with_snapshots  # noqa: E402
 
 
 @dataclass
@@ -24,64 +31,33 @@ class TreeEntry:
     total_size_bytes: int
 
 
-def include_path(path: Path, include_hidden: bool) -> bool:
-    if include_hidden:
-        return True
-    return not any(part.startswith(".") for part in path.parts)
+def inventory_from_scan(scan: TreeScan, max_depth: int = 2) -> list[TreeEntry]:
+    directories = [directory for directory in scan.directories if directory.depth <= max_depth]
+    directories.sort(key=lambda directory: () if directory.path == "." else Path(directory.path).parts)
+    return [
+        TreeEntry(
+            path=directory.path,
+            depth=directory.depth,
+            direct_file_count=directory.direct_file_count,
+            total_file_count=directory.total_file_count,
+            child_dir_count=directory.child_dir_count,
+            total_size_bytes=directory.total_size_bytes,
+        )
+        for directory in directories
+    ]
 
 
-def iter_files(root: Path, include_hidden: bool) -> Iterable[Path]:
-    for path in root.rglob("*"):
-        if path.is_file() and include_path(path.relative_to(root), include_hidden):
-            yield path
+def build_inventory(root: Path, max_depth: int = 2, include_hidden: bool = False) -> list[TreeEntry]:
+    return inventory_from_scan(scan_tree(root, include_hidden=include_hidden), max_depth=max_depth)
 
 
-def build_inventory(root: Path, max_depth: int = 2, include_hidden: bool = False) -> list[TreeEntry]:
-    root = root.resolve()
-    directories = [root]
-    for path in root.rglob("*"):
-        if not path.is_dir():
-            continue
-        relative = path.relative_to(root)
-        if not include_path(relative, include_hidden):
-            continue
-        depth = len(relative.parts)
-        if depth <= max_depth:
-            directories.append(path)
-
-    entries: list[TreeEntry] = []
-    for directory in sorted(directories):
-        relative = directory.relative_to(root)
-        depth = len(relative.parts)
-        direct_files = 0
-        child_dirs = 0
-        for child in directory.iterdir():
-            child_relative = child.relative_to(root)
-            if not include_path(child_relative, include_hidden):
-                continue
-            if child.is_file():
-                direct_files += 1
-            elif child.is_dir():
-                child_dirs += 1
-
-        total_files = 0
-        total_size = 0
-        for file_path in iter_files(directory, include_hidden):
-            total_files += 1
-            total_size += file_path.stat().st_size
-
-        path_label = "." if directory == root else str(relative)
-        entries.append(
-            TreeEntry(
-                path=path_label,
-                depth=depth,
-                direct_file_count=direct_files,
-                total_file_count=total_files,
-                child_dir_count=child_dirs,
-                total_size_bytes=total_size,
-            )
-        )
-    return entries
+def inventory_payload(scan: TreeScan, max_depth: int = 2) -> dict[str, object]:
+    return {
+        "root": str(scan.root),
+        "max_depth": max_depth,
+        "include_hidden": scan.include_hidden,
+        "entries": [asdict(entry) for entry in inventory_from_scan(scan, max_depth=max_depth)],
+    }
 
 
 def parse_args() -> argparse.Namespace:
@@ -89,19 +65,28 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("root", help="Root directory to summarize")
     parser.add_argument("--max-depth", type=int, default=2, help="Maximum directory depth to include")
     parser.add_argument("--include-hidden", action="store_true", help="Include hidden files and folders")
+    add_snapshot_arguments(parser)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Hashing threads for --hash-contents")
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
-    root = Path(args.root)
-    entries = build_inventory(root, max_depth=args.max_depth, include_hidden=args.include_hidden)
-    payload = {
-        "root": str(root.resolve()),
-        "max_depth": args.max_depth,
-        "include_hidden": args.include_hidden,
-        "entries": [asdict(entry) for entry in entries],
-    }
+    try:
+        scan, changes = scan_with_snapshots(
+            Path(args.root),
+            include_hidden=args.include_hidden,
+            since=args.since,
+            snapshot=args.snapshot,
+            hash_contents=args.hash_contents,
+            workers=args.workers,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    payload = inventory_payload(scan, max_depth=args.max_depth)
+    if changes is not None:
+        payload["changes"] = changes
     print(json.dumps(payload, indent=2))
     return 0
 
@@ -0,0 +1,104 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+
+
+def load_module(module_name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class ContentHashesUnitTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        sys.path.insert(0, str(SCRIPTS_DIR))
+        self.scan_module = load_module("document_scan", SCRIPTS_DIR / "document_scan.py")
+        self.module = load_module("content_hashes", SCRIPTS_DIR / "content_hashes.py")
+
+    def tearDown(self):
+        sys.path.remove(str(SCRIPTS_DIR))
+        self.tmpdir.cleanup()
+
+    def write(self, relative: str, data: bytes) -> None:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def report(self):
+        scan = self.scan_module.scan_tree(self.root)
+        return self.module.content_duplicates_from_scan(scan, workers=2)
+
+    def test_groups_identical_bytes_under_different_names(self):
+        self.write("Taxes/2024 return.pdf", b"return")
+        self.write("Inbox/scan0001.pdf", b"return")
+        self.write("Inbox/other.pdf", b"differ")
+        self.write("empty-a.txt", b"")
+        self.write("empty-b.txt", b"")
+
+        payload = self.report()
+
+        self.assertEqual(
+            [group["occurrences"] for group in payload["duplicate_groups"]],
+            [[str(Path("Inbox/scan0001.pdf")), str(Path("Taxes/2024 return.pdf"))]],
+        )
+        self.assertEqual(payload["redundant_bytes"], 6)
+        self.assertEqual(payload["stats"]["files_considered"], 3)
+        self.assertEqual(payload["stats"]["full_hashed_files"], 0)
+
+    def test_large_files_with_equal_edges_are_confirmed_by_full_hash(self):
+        edge = b"E" * self.module.EDGE_BYTES
+        self.write("a.bin", edge + b"middle-1" + edge)
+        self.write("b.bin", edge + b"middle-2" + edge)
+        self.write("c.bin", edge + b"middle-1" + edge)
+        self.write("d.bin", b"x" + edge + b"middle-" + edge)
+
+        payload = self.report()
+
+        self.assertEqual([group["occurrences"] for group in payload["duplicate_groups"]], [["a.bin", "c.bin"]])
+        self.assertEqual(payload["stats"]["edge_hashed_files"], 4)
+        self.assertEqual(payload["stats"]["full_hashed_files"], 3)
+
+    def test_hard_links_and_symlinks_are_not_duplicates(self):
+        self.write("a.pdf", b"A" * 10_000)
+        os.link(self.root / "a.pdf", self.root / "hard.pdf")
+        os.symlink("a.pdf", self.root / "link.pdf")
+
+        payload = self.report()
+
+        self.assertEqual(payload["duplicate_groups"], [])
+        self.assertEqual(payload["redundant_bytes"], 0)
+        self.assertEqual((payload["stats"]["skipped_hard_links"], payload["stats"]["skipped_symlinks"]), (1, 1))
+
+        self.write("copy.pdf", b"A" * 10_000)
+        payload = self.report()
+        self.assertEqual([group["occurrences"] for group in payload["duplicate_groups"]], [["a.pdf", "copy.pdf"]])
+        self.assertEqual(payload["redundant_bytes"], 10_000)
+
+    def test_snapshots_keep_device_and_symlink_flags(self):
+        snapshot_module = load_module("inventory_snapshot", SCRIPTS_DIR / "inventory_snapshot.py")
+        self.write("a.pdf", b"A" * 10)
+        os.symlink("a.pdf", self.root / "link.pdf")
+        scan = self.scan_module.scan_tree(self.root)
+        path = self.root.parent / f"{self.root.name}.snapshot.json"
+        self.addCleanup(path.unlink, missing_ok=True)
+
+        snapshot_module.save_snapshot(path, scan)
+        loaded = snapshot_module.load_snapshot(path)
+
+        self.assertEqual(loaded.files, scan.files)
+        self.assertEqual([record.symlink for record in loaded.files], [False, True])
+        self.assertNotEqual(loaded.files[0].device, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -42,6 +42,13 @@ class DocumentAuditE2ETest(unittest.TestCase):
         self.assertEqual(len(duplicates["duplicate_groups"]), 1)
         self.assertEqual(duplicates["duplicate_groups"][0]["basename"], "scan.pdf")
 
+    def test_document_audit_matches_individual_reports_in_one_pass(self):
+        combined = self.run_script("document_audit.py")
+
+        self.assertEqual(combined["inventory"], self.run_script("inventory_tree.py"))
+        self.assertEqual(combined["extensions"], self.run_script("extension_summary.py"))
+        self.assertEqual(combined["duplicate_names"], self.run_script("duplicate_name_report.py"))
+
 
 if __name__ == "__main__":
     unittest.main()
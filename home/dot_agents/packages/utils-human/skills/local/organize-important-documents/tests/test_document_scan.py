@@ -0,0 +1,52 @@
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+def load_module(module_name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class DocumentScanUnitTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        (self.root / "Taxes" / "2024").mkdir(parents=True)
+        (self.root / "Taxes" / "2024" / "return.pdf").write_text("12345")
+        (self.root / "Taxes" / "w2.pdf").write_text("123")
+        (self.root / ".cache" / "deep").mkdir(parents=True)
+        (self.root / ".cache" / "deep" / "blob.bin").write_text("hidden")
+        (self.root / "notes.txt").write_text("1")
+        self.module = load_module(
+            "document_scan",
+            Path(__file__).resolve().parents[1] / "scripts" / "document_scan.py",
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_scan_rolls_up_totals_and_prunes_hidden_directories(self):
+        scan = self.module.scan_tree(self.root)
+        directories = {directory.path: directory for directory in scan.directories}
+
+        self.assertEqual(set(directories), {".", "Taxes", str(Path("Taxes") / "2024")})
+        self.assertEqual(directories["."].total_file_count, 3)
+        self.assertEqual(directories["."].total_size_bytes, 9)
+        self.assertEqual(directories["."].child_dir_count, 1)
+        self.assertEqual(directories["Taxes"].direct_file_count, 1)
+        self.assertEqual(directories["Taxes"].total_size_bytes, 8)
+
+    def test_scan_includes_hidden_entries_when_requested(self):
+        scan = self.module.scan_tree(self.root, include_hidden=True)
+        self.assertIn(str(Path(".cache") / "deep" / "blob.bin"), {record.path for record in scan.files})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from dataclasses import asdict
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+
+
+def load_module(module_name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class InventorySnapshotUnitTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name) / "Documents"
+        self.snapshot_path = Path(self.tmpdir.name) / "state" / "documents.json"
+        for relative, data in {
+            "Taxes/return.pdf": "return",
+            "Inbox/scan0001.pdf": "scan",
+            "Medical/visit.pdf": "abc",
+            "Archive/2019/old.pdf": "old",
+        }.items():
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(data)
+        sys.path.insert(0, str(SCRIPTS_DIR))
+        self.scan_module = load_module("document_scan", SCRIPTS_DIR / "document_scan.py")
+        self.module = load_module("inventory_snapshot", SCRIPTS_DIR / "inventory_snapshot.py")
+
+    def tearDown(self):
+        sys.path.remove(str(SCRIPTS_DIR))
+        self.tmpdir.cleanup()
+
+    def backdate_directories(self):
+        # Directories touched within the racy window of a snapshot are always rescanned.
+        an_hour_ago = time.time() - 3600
+        for directory, _dirnames, _filenames in os.walk(self.root):
+            os.utime(directory, (an_hour_ago, an_hour_ago))
+
+    def snapshot(self, **kwargs):
+        return self.module.scan_with_snapshots(self.root, snapshot=self.snapshot_path, **kwargs)
+
+    def test_since_reuses_unchanged_directories_and_reports_moves_and_resizes(self):
+        self.backdate_directories()
+        self.snapshot()
+
+        (self.root / "Inbox" / "scan0001.pdf").rename(self.root / "Taxes" / "w2.pdf")
+        replacement = self.root / "Medical" / "visit.pdf.tmp"
+        replacement.write_text("abcdef")
+        replacement.replace(self.root / "Medical" / "visit.pdf")
+        (self.root / "Receipts").mkdir()
+        (self.root / "Receipts" / "laptop.pdf").write_text("receipt")
+
+        scan, changes = self.module.scan_with_snapshots(self.root, since=self.snapshot_path)
+
+        self.assertEqual(changes["added"], [{"path": str(Path("Receipts/laptop.pdf")), "size_bytes": 7}])
+        self.assertEqual(changes["removed"], [])
+        self.assertEqual(
+            changes["moved"],
+            [
+                {
+                    "from": str(Path("Inbox/scan0001.pdf")),
+                    "to": str(Path("Taxes/w2.pdf")),
+                    "size_bytes": 4,
+                    "matched_by": "inode",
+                }
+            ],
+        )
+        self.assertEqual(
+            changes["resized"],
+            [{"path": str(Path("Medical/visit.pdf")), "old_size_bytes": 3, "new_size_bytes": 6}],
+        )
+        self.assertEqual(changes["reused_directories"], 2)
+
+        full = self.scan_module.scan_tree(self.root)
+        self.assertEqual(
+            sorted((asdict(record) for record in scan.files), key=lambda record: record["path"]),
+            sorted((asdict(record) for record in full.files), key=lambda record: record["path"]),
+        )
+        self.assertEqual(
+            sorted((d.path, d.total_file_count, d.total_size_bytes, d.child_dir_count) for d in scan.directories),
+            sorted((d.path, d.total_file_count, d.total_size_bytes, d.child_dir_count) for d in full.directories),
+        )
+
+    def test_content_hashes_match_moves_across_inodes(self):
+        self.backdate_directories()
+        self.snapshot(hash_contents=True)
+
+        shutil.copyfile(self.root / "Taxes" / "return.pdf", self.root / "Archive" / "return-2024.pdf")
+        (self.root / "Taxes" / "return.pdf").unlink()
+
+        scan, changes = self.snapshot(since=self.snapshot_path, hash_contents=True)
+
+        self.assertEqual(changes["counts"], {"added": 0, "removed": 0, "moved": 1, "resized": 0})
+        self.assertEqual(changes["moved"][0]["matched_by"], "content_hash")
+        self.assertTrue(all(record.content_hash for record in scan.files))
+
+    def test_since_rejects_snapshot_of_another_root(self):
+        self.snapshot()
+        with self.assertRaises(ValueError):
+            self.module.scan_with_snapshots(self.root / "Taxes", since=self.snapshot_path)
+
+
+if __name__ == "__main__":
+    unittest.main()